@@ -2,6 +2,7 @@
 import pyautogui
 
 from . import event_loop
+from .event_loop import RealClock
 from .gestures import Automaton
 
 
@@ -9,10 +10,12 @@ class Animatron(Automaton):
     """
     A robotic automaton that emulates a human using the keyboard and mouse.
 
-    It is more realistic although slower than the Robot.
+    It is more realistic although slower than the Robot. As the OS tells clicks apart by the real time between them,
+    the Animatron always pauses in real time.
     """
     def __init__(self, pause=0):
         self.pause = pause
+        self._clock = RealClock()
 
     @property
     def mouse_position(self):
@@ -45,4 +48,4 @@ class Animatron(Automaton):
         event_loop.process_pending_events()
 
     def delay(self, ms):
-        event_loop.process_events_for(ms)
+        return self._clock.wait(ms)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Generates page objects - QWidgetDriver subclasses - from Qt Designer .ui files.
+
+Each named widget of the form gets an accessor returning the cute driver for its class, which finds the widget
+by following the path of object names from the form down to the widget, instead of searching the whole tree.
+
+Usage: python -m cute.designer form.ui [other_form.ui ...] [-o drivers.py]
+"""
+import argparse
+import keyword
+import os
+import re
+import sys
+import xml.etree.ElementTree as ElementTree
+
+from PyQt5 import QtWidgets
+
+from . import widgets
+
+DRIVERS = {
+    "QCalendarWidget": "QCalendarDriver",
+    "QCheckBox": "QButtonDriver",
+    "QComboBox": "QComboBoxDriver",
+    "QDateEdit": "QDateTimeEditDriver",
+    "QDateTimeEdit": "QDateTimeEditDriver",
+    "QDialog": "QDialogDriver",
+    "QDialogButtonBox": "QDialogButtonBoxDriver",
+    "QLabel": "QLabelDriver",
+    "QLineEdit": "QLineEditDriver",
+    "QListView": "QListViewDriver",
+    "QListWidget": "QListViewDriver",
+    "QMenu": "QMenuDriver",
+    "QMenuBar": "QMenuBarDriver",
+    "QPlainTextEdit": "QPlainTextEditDriver",
+    "QPushButton": "QButtonDriver",
+    "QRadioButton": "QButtonDriver",
+    "QSpinBox": "QSpinBoxDriver",
+    "QTabBar": "QTabBarDriver",
+    "QTableView": "QTableViewDriver",
+    "QTableWidget": "QTableViewDriver",
+    "QTabWidget": "QTabWidgetDriver",
+    "QTimeEdit": "QDateTimeEditDriver",
+    "QToolButton": "QToolButtonDriver",
+}
+DEFAULT_DRIVER = "QWidgetDriver"
+
+
+class FormWidget:
+    def __init__(self, class_name, name, path):
+        self.class_name = class_name
+        self.name = name
+        self.path = path
+
+
+class Form:
+    def __init__(self, filename):
+        root = ElementTree.parse(filename).getroot()
+        self.filename = os.path.basename(filename)
+        self._custom_bases = dict((custom.findtext("class"), custom.findtext("extends"))
+                                  for custom in root.iter("customwidget"))
+        top_level = root.find("widget")
+        self.class_name = root.findtext("class") or _class_name_of(top_level.get("name"))
+        self.widget = FormWidget(self._qt_class_of(top_level.get("class")), top_level.get("name"), ())
+        self.children = list(self._children_of(top_level, ()))
+
+    def _children_of(self, element, path):
+        # Layouts are not part of the path, as the widgets they lay out are children of the widget they manage
+        for child in element:
+            if child.tag == "widget":
+                child_path = path + (child.get("name"),)
+                yield FormWidget(self._qt_class_of(child.get("class")), child.get("name"), child_path)
+                for descendant in self._children_of(child, child_path):
+                    yield descendant
+            elif child.tag in ("layout", "item"):
+                for descendant in self._children_of(child, path):
+                    yield descendant
+
+    def _qt_class_of(self, class_name):
+        # Promoted widgets are looked up as the Qt class they extend
+        while class_name in self._custom_bases:
+            class_name = self._custom_bases[class_name]
+        return class_name if hasattr(QtWidgets, class_name) else "QWidget"
+
+
+def generate(*filenames):
+    """Returns the source code of the drivers for the forms found in the given .ui files"""
+    forms = [Form(filename) for filename in filenames]
+    qt_classes = sorted(set(widget.class_name for form in forms for widget in [form.widget] + form.children))
+    drivers = sorted(set(["QWidgetDriver"] + [_driver_of(widget) for form in forms
+                                              for widget in [form.widget] + form.children]))
+
+    lines = ["# -*- coding: utf-8 -*-",
+             "# Generated by cute.designer from {0}, do not edit".format(", ".join(form.filename for form in forms)),
+             "from PyQt5.QtWidgets import {0}".format(", ".join(qt_classes)),
+             "",
+             "from cute import matchers as match",
+             "from cute.widgets import window, {0}".format(", ".join(drivers))]
+    for form in forms:
+        lines.extend(["", ""] + _driver_class_of(form))
+    return "\n".join(lines) + "\n"
+
+
+def _driver_class_of(form):
+    base_driver = _driver_of(form.widget)
+    lines = ["class {0}Driver({1}):".format(form.class_name, base_driver),
+             '    """Drives the {0} form of {1}"""'.format(form.widget.name, form.filename),
+             "",
+             "    @classmethod",
+             "    def find_window(cls, prober, gesture_performer):",
+             '        return cls(window({0}, match.named("{1}")), prober, gesture_performer)'.format(
+                 form.widget.class_name, form.widget.name)]
+
+    taken = set(dir(getattr(widgets, base_driver)))
+    for widget in form.children:
+        accessor = _accessor_name_of(widget.name, taken)
+        taken.add(accessor)
+        lines.extend(["",
+                      "    def {0}(self):".format(accessor),
+                      "        return {0}.find_by_path(self, {1}, {2})".format(
+                          _driver_of(widget), widget.class_name, ", ".join('"{0}"'.format(name)
+                                                                           for name in widget.path))])
+    return lines
+
+
+def _driver_of(widget):
+    return DRIVERS.get(widget.class_name, DEFAULT_DRIVER)
+
+
+def _class_name_of(name):
+    return name[:1].upper() + name[1:]
+
+
+def _accessor_name_of(name, taken):
+    accessor = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name).lower()
+    # Never hide the methods of the driver itself
+    while accessor in taken or keyword.iskeyword(accessor):
+        accessor += "_widget"
+    return accessor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cute.designer",
+                                     description="Generates cute drivers from Qt Designer .ui files")
+    parser.add_argument("forms", nargs="+", metavar="FORM", help=".ui file to generate a driver for")
+    parser.add_argument("-o", "--output", help="file to write the drivers to, instead of the standard output")
+    args = parser.parse_args(argv)
+
+    source = generate(*args.forms)
+    if args.output is None:
+        sys.stdout.write(source)
+    else:
+        with open(args.output, "w") as output:
+            output.write(source)
+
+
+if __name__ == "__main__":
+    main()
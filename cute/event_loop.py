@@ -1,33 +1,201 @@
 # -*- coding: utf-8 -*-
 import time
 
-from PyQt5.QtCore import QCoreApplication, QEventLoop
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QObject, QEvent, QTimer, Qt, QAbstractEventDispatcher
 
 
 ONE_SECOND_IN_MILLIS = 1000
 
+class Clock(object):
+    def time(self):
+        """Returns the current time, in seconds"""
+        pass
+
+    def wait(self, ms):
+        """Processes events for the given duration, returning how late it returned, in ms"""
+        pass
+
+
+class RealClock(Clock):
+    def time(self):
+        return time.perf_counter()
+
+    def wait(self, ms):
+        return process_events_for(ms)
+
+
+class VirtualClock(Clock):
+    """
+    A clock that jumps forward instead of sleeping as soon as the application has no more pending events.
+
+    Only waits and timeouts measured with this clock are shortened, timers of the application under test still fire
+    in real time. It is therefore only meant for the gesture pauses of a Robot, in tests that do not rely on the
+    timers of the application. Probers and the Animatron always use real time.
+    """
+
+    def __init__(self):
+        self._offset = 0
+
+    def time(self):
+        return time.perf_counter() + self._offset
+
+    def wait(self, ms):
+        deadline = self.time() + ms / ONE_SECOND_IN_MILLIS
+        while self.time() < deadline and dispatch_pending_events():
+            pass
+
+        if self.time() < deadline:
+            self._offset += deadline - self.time()
+        return (self.time() - deadline) * ONE_SECOND_IN_MILLIS
+
 
 class Timeout(object):
-    def __init__(self, duration_in_ms):
+    def __init__(self, duration_in_ms, clock=None):
         self._duration = duration_in_ms
-        self._start_time = time.time()
+        self._clock = clock or RealClock()
+        self._start_time = self._clock.time()
 
     def has_expired(self):
-        return self.elapsed_time(time.time()) >= self._duration
+        return self.elapsed_time(self._clock.time()) >= self._duration
 
     def elapsed_time(self, now):
         return (now - self._start_time) * ONE_SECOND_IN_MILLIS
 
-
-SLEEP_DELAY_IN_MILLIS = 10
+    def remaining_time(self):
+        return max(0, self._duration - self.elapsed_time(self._clock.time()))
 
 
 def process_events_for(ms):
-    timeout = Timeout(ms)
-    while not timeout.has_expired():
-        process_pending_events(ms)
-        time.sleep(SLEEP_DELAY_IN_MILLIS / ONE_SECOND_IN_MILLIS)
+    """
+    Processes events until the given duration has elapsed, sleeping in a nested event loop
+    rather than spinning. The last fraction of a millisecond is spent processing pending events.
+
+    Returns how late it returned, in ms.
+    """
+    deadline = time.perf_counter() + ms / ONE_SECOND_IN_MILLIS
+    if QCoreApplication.instance() is None:
+        time.sleep(max(0, ms) / ONE_SECOND_IN_MILLIS)
+    elif ms >= 1:
+        run_event_loop_for(QEventLoop(), int(ms))
+
+    process_pending_events()
+    while time.perf_counter() < deadline:
+        process_pending_events()
+    return (time.perf_counter() - deadline) * ONE_SECOND_IN_MILLIS
+
+
+def run_event_loop_for(loop, ms):
+    """Runs the loop until it quits or the given whole number of ms has elapsed"""
+    timer = QTimer()
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    timer.start(ms)
+    loop.exec_()
+    timer.stop()
 
 
 def process_pending_events(for_ms=0):
     QCoreApplication.processEvents(QEventLoop.AllEvents, for_ms)
+
+
+def dispatch_pending_events():
+    """Processes pending events without waiting for new ones, returning whether there were any"""
+    dispatcher = QAbstractEventDispatcher.instance()
+    return dispatcher is not None and dispatcher.processEvents(QEventLoop.AllEvents)
+
+
+class ChangeWatcher(QObject):
+    """
+    Watches the whole application for events that are likely to change what probes see,
+    so that waiting can end as soon as something relevant happens.
+    """
+    RELEVANT_EVENTS = frozenset((
+        QEvent.Show, QEvent.Hide, QEvent.Close,
+        QEvent.ChildAdded, QEvent.ChildRemoved, QEvent.ParentChange,
+        QEvent.DynamicPropertyChange, QEvent.EnabledChange, QEvent.WindowTitleChange,
+        QEvent.FocusIn, QEvent.FocusOut, QEvent.WindowActivate, QEvent.WindowDeactivate,
+        QEvent.KeyPress, QEvent.KeyRelease, QEvent.MouseButtonPress, QEvent.MouseButtonRelease,
+        QEvent.MouseButtonDblClick, QEvent.MetaCall,
+        # Most property changes - text, check state, values - only show as a repaint of the widget
+        QEvent.UpdateRequest, QEvent.Paint,
+    ))
+
+    def __init__(self, app):
+        super().__init__()
+        self._app = app
+        self._changed = False
+        self._loop = None
+        self._signals = []
+        self._signals_until_uninstalled = {}
+
+    def install(self):
+        self._changed = False
+        self._app.installEventFilter(self)
+        for signal in self._signals:
+            signal.connect(self.wake)
+        _installed_watchers.add(self)
+
+    def uninstall(self):
+        self._app.removeEventFilter(self)
+        for signal in self._signals + list(self._signals_until_uninstalled.values()):
+            _disconnect(signal, self.wake)
+        self._signals_until_uninstalled.clear()
+        _installed_watchers.discard(self)
+
+    def watch(self, signal):
+        """Watches the signal while the watcher is installed"""
+        self._signals.append(signal)
+        if self in _installed_watchers:
+            signal.connect(self.wake)
+
+    def watch_until_uninstalled(self, sender, signal_name):
+        key = (sender, signal_name)
+        if key not in self._signals_until_uninstalled:
+            signal = getattr(sender, signal_name)
+            signal.connect(self.wake)
+            self._signals_until_uninstalled[key] = signal
+
+    def wake(self, *_):
+        self._changed = True
+        if self._loop is not None:
+            self._loop.quit()
+
+    def eventFilter(self, target, event):
+        if event.type() in self.RELEVANT_EVENTS:
+            self.wake()
+        return False
+
+    def wait_for_change(self, at_most_ms):
+        if not self._changed:
+            self._loop = QEventLoop()
+            run_event_loop_for(self._loop, int(at_most_ms))
+            self._loop = None
+        process_pending_events()
+        self._changed = False
+
+
+def _disconnect(signal, slot):
+    try:
+        signal.disconnect(slot)
+    except (TypeError, RuntimeError):
+        # The sender is already gone, taking its connections with it
+        pass
+
+
+_installed_watchers = set()
+
+
+def wake_watchers():
+    """Reports a change that no event reveals, such as a signal received by a probe, to all installed watchers"""
+    for watcher in list(_installed_watchers):
+        watcher.wake()
+
+
+def wake_watchers_on(sender, signal_name):
+    """
+    Wakes up the watchers installed - those of the checks in progress - whenever the sender emits the signal,
+    for changes that no event reveals such as property change notifications. The signal is released once they end.
+    """
+    for watcher in list(_installed_watchers):
+        watcher.watch_until_uninstalled(sender, signal_name)
@@ -1,35 +1,138 @@
 # -*- coding: utf-8 -*-
-from .prober import Probe
+from itertools import islice
+
+from PyQt5.QtCore import QObject, QEvent
+from PyQt5.QtWidgets import QApplication
+from hamcrest.core.string_description import StringDescription
+
+from . import hints as path_hints
+from .matchers import NameLookup, compile_matcher
+from .prober import Probe, run_test_once
 
 
 class WidgetFinder(Probe):
     def widgets(self):
+        """Returns the widgets found, in tree order"""
         pass
 
+    def test_up_to(self, count, any_order=False):
+        """
+        Tests the finder, which may stop searching once it has found count widgets, or never if count is None.
+        The widgets found are the first ones in tree order, unless any of them will do.
+        """
+        self.test()
+
+    def confirms(self, widget):
+        """Tells whether the widget, once found, still meets the criteria of the finder without searching again"""
+        return False
+
+    def indexed_descendants(self, widget_type, name=None, any_order=False):
+        """
+        Returns (root, widget) pairs for the descendants of the given type - and name, if any - of the widgets found,
+        in tree order unless any order will do, or None if the finder has no index to answer from.
+        """
+        return None
+
 
 class WidgetSelector(WidgetFinder):
     def widget(self):
         return self.widgets()[0] if self.widgets() else None
 
 
+class Traversal(object):
+    """
+    How finders walk widget trees. By default every widget is visited exactly once, and never pruned.
+
+    Optionally, the walk can skip hidden subtrees, search only the active window and stop at the first match,
+    when existence is all that matters. Pruning requires walking the trees from Python, one level at a time.
+    """
+
+    def __init__(self, skip_hidden=False, active_window_only=False, first_match_only=False):
+        self.skip_hidden = skip_hidden
+        self.active_window_only = active_window_only
+        self.first_match_only = first_match_only
+
+    @property
+    def prunes(self):
+        return self.skip_hidden or self.active_window_only
+
+    def roots_among(self, widgets):
+        if self.active_window_only:
+            windows = _active_windows()
+            # Widgets within an active window are searched as is, widgets holding an active window from that window
+            inside = [widget for widget in widgets if widget.isWidgetType() and widget.window() in windows]
+            holding = [window for window in windows
+                       if window not in inside and any(_is_ancestor(widget, window) for widget in widgets)]
+            widgets = inside + holding
+        return [widget for widget in widgets if not self.prunes_subtree(widget)]
+
+    def prunes_subtree(self, widget):
+        if not widget.isWidgetType():
+            return False
+        if self.skip_hidden and not widget.isVisible():
+            return True
+        return self.active_window_only and widget.isWindow() and widget not in _active_windows()
+
+
+def _active_windows():
+    return [window for window in (QApplication.activeWindow(), QApplication.activePopupWidget()) if window is not None]
+
+
+def _is_ancestor(ancestor, widget):
+    while widget is not None:
+        if widget is ancestor:
+            return True
+        widget = widget.parent()
+    return False
+
+
 class RecursiveWidgetFinder(WidgetFinder):
-    def __init__(self, widget_type, criteria, parent_finder):
+    def __init__(self, widget_type, criteria, parent_finder, traversal=None):
         super(RecursiveWidgetFinder, self).__init__()
         self._widget_type = widget_type
         self._criteria = criteria
+        self._name_lookup = NameLookup(criteria)
+        self._matches_criteria = compile_matcher(criteria)
+        self._matches_remaining_criteria = compile_matcher(self._name_lookup.remaining_criteria)
         self._parent_finder = parent_finder
-        self._found = set()
+        self._traversal = traversal or Traversal()
+        self._found = ()
+        self._key = None
+        self.nodes_visited = 0
 
     def is_satisfied(self):
         return self._parent_finder.is_satisfied()
 
+    def is_impossible(self):
+        return self._parent_finder.is_impossible()
+
+    def confirms(self, widget):
+        return self._matches(widget)
+
     def widgets(self):
-        return tuple(self._found)
+        return self._found
 
     def test(self):
-        self._parent_finder.test()
-        self._found.clear()
-        self._search(self._parent_finder.widgets())
+        self.test_up_to(None)
+
+    def test_up_to(self, count, any_order=False):
+        run_test_once(self._parent_finder)
+        self.nodes_visited = 0
+        limit = 1 if self._traversal.first_match_only else count
+        any_order = any_order or self._traversal.first_match_only
+        hints = path_hints.installed()
+
+        # When any single widget will do, the hinted widget spares us the search
+        if hints is not None and limit == 1 and any_order and not self._traversal.prunes:
+            hinted = hints.lookup(self._hint_key(), self._parent_finder.widgets(), self._matches)
+            if hinted is not None:
+                self._found = (hinted,)
+                return
+
+        self._found = tuple(islice(_unique(self._search(any_order)), limit))
+        # Only when the search could have found more widgets do we know the widget found is unique
+        if hints is not None and len(self._found) == 1 and limit != 1:
+            hints.record(self._hint_key(), self._parent_finder.widgets(), self._found[0])
 
     def describe_to(self, description):
         description.append_text(self._widget_type.__name__) \
@@ -41,32 +144,207 @@ class RecursiveWidgetFinder(WidgetFinder):
     def describe_failure_to(self, description):
         self._parent_finder.describe_failure_to(description)
 
-    def _search(self, widgets):
-        for widget in widgets:
-            self._search_within(widget)
+    def _search(self, any_order):
+        descendants = None if self._traversal.prunes else \
+            self._parent_finder.indexed_descendants(self._widget_type, self._name_lookup.name, any_order)
+        if descendants is None:
+            return self._search_trees(self._traversal.roots_among(self._parent_finder.widgets()))
+        return self._search_index(self._parent_finder.widgets(), descendants)
+
+    def _search_trees(self, roots):
+        for root in roots:
+            # As a matching root hides its descendants, it is either the root or its descendants that are found
+            self.nodes_visited += 1
+            if self._matches(root):
+                yield root
+                continue
+
+            for descendant in self._descendants_of(root):
+                self.nodes_visited += 1
+                if self._matches_descendant(descendant):
+                    yield descendant
+
+    def _descendants_of(self, widget):
+        if self._traversal.prunes:
+            return self._walk(widget)
+        if self._name_lookup.native_argument is None:
+            return widget.findChildren(self._widget_type)
+        return widget.findChildren(self._widget_type, self._name_lookup.native_argument)
+
+    def _walk(self, widget):
+        pending = list(reversed(widget.children()))
+        while pending:
+            child = pending.pop()
+            if self._traversal.prunes_subtree(child):
+                continue
+            yield child
+            pending.extend(reversed(child.children()))
+
+    def _search_index(self, roots, descendants):
+        # Just like when searching the trees, descendants of matching roots are left out
+        self.nodes_visited += len(roots)
+        matching_roots = [root for root in roots if self._matches(root)]
+        for root in matching_roots:
+            yield root
+
+        for root, widget in descendants:
+            self.nodes_visited += 1
+            if root not in matching_roots and self._matches_descendant(widget):
+                yield widget
+
+    def _matches(self, widget):
+        return isinstance(widget, self._widget_type) and self._matches_criteria(widget)
+
+    def _matches_descendant(self, widget):
+        return isinstance(widget, self._widget_type) and self._name_lookup.matches_name(widget) and \
+               self._matches_remaining_criteria(widget)
+
+    def _hint_key(self):
+        if self._key is None:
+            self._key = str(StringDescription().append_description_of(self))
+        return self._key
+
+
+def _unique(widgets):
+    seen = set()
+    for widget in widgets:
+        if widget not in seen:
+            seen.add(widget)
+            yield widget
+
+
+class ObjectPathFinder(WidgetFinder):
+    """
+    Finds widgets by following a path of object names down from the widgets found by its parent.
+    Each name is looked up below the previous object, among its direct children first. Objects that Qt inserts
+    in between - such as the viewport of a scroll area or the stack of a tab widget - can then be left out.
+    """
+
+    def __init__(self, widget_type, path, parent_finder):
+        super(ObjectPathFinder, self).__init__()
+        self._widget_type = widget_type
+        self._path = tuple(path)
+        self._parent_finder = parent_finder
+        self._found = ()
 
-    def _search_within(self, widget):
-        if isinstance(widget, self._widget_type) and self._criteria.matches(widget):
-            self._found.add(widget)
-        else:
-            self._search(widget.findChildren(self._widget_type))
+    def is_satisfied(self):
+        return self._parent_finder.is_satisfied()
+
+    def is_impossible(self):
+        return self._parent_finder.is_impossible()
+
+    def confirms(self, widget):
+        return isinstance(widget, self._widget_type) and widget.objectName() == self._path[-1]
+
+    def widgets(self):
+        return self._found
+
+    def test(self):
+        self.test_up_to(None)
+
+    def test_up_to(self, count, any_order=False):
+        run_test_once(self._parent_finder)
+        found = (self._follow_path_from(root) for root in self._parent_finder.widgets())
+        self._found = tuple(islice(_unique(widget for widget in found if widget is not None), count))
+
+    def _follow_path_from(self, widget):
+        for name in self._path[:-1]:
+            widget = widget.findChild(QObject, name)
+            if widget is None:
+                return None
+        return widget.findChild(self._widget_type, self._path[-1])
+
+    def describe_to(self, description):
+        description.append_text("{0} at path '{1}'".format(self._widget_type.__name__, "/".join(self._path))) \
+            .append_text("\n  in ") \
+            .append_description_of(self._parent_finder)
+
+    def describe_failure_to(self, description):
+        self._parent_finder.describe_failure_to(description)
+
+
+class QueryPlanFinder(WidgetFinder):
+    """Finds the widgets selected by a compiled query, in a single pass over the widgets found by its parent"""
+
+    def __init__(self, plan, parent_finder):
+        super(QueryPlanFinder, self).__init__()
+        self._plan = plan
+        self._parent_finder = parent_finder
+        self._found = ()
+
+    def is_satisfied(self):
+        return self._parent_finder.is_satisfied()
+
+    def is_impossible(self):
+        return self._parent_finder.is_impossible()
+
+    def confirms(self, widget):
+        return self._plan.matches(widget, None)
+
+    def widgets(self):
+        return self._found
+
+    def test(self):
+        self.test_up_to(None)
+
+    def test_up_to(self, count, any_order=False):
+        run_test_once(self._parent_finder)
+        roots = self._parent_finder.widgets()
+        selected = (widget for root, widget in self._candidates_within(roots, any_order)
+                    if self._plan.matches(widget, root))
+        self._found = tuple(islice(_unique(selected), count))
+
+    def _candidates_within(self, roots, any_order):
+        for root in roots:
+            yield root, root
+
+        descendants = self._parent_finder.indexed_descendants(self._plan.candidate_type, self._plan.candidate_name,
+                                                              any_order)
+        if descendants is not None:
+            for root, widget in descendants:
+                yield root, widget
+            return
+
+        for root in roots:
+            if self._plan.candidate_name is None:
+                candidates = root.findChildren(self._plan.candidate_type)
+            else:
+                candidates = root.findChildren(self._plan.candidate_type, self._plan.candidate_name)
+            for widget in candidates:
+                yield root, widget
+
+    def describe_to(self, description):
+        description.append_text("selection '{0}'".format(self._plan.query)) \
+            .append_text("\n  in ") \
+            .append_description_of(self._parent_finder)
+
+    def describe_failure_to(self, description):
+        self._parent_finder.describe_failure_to(description)
 
 
 class TopLevelWidgetsFinder(WidgetFinder):
-    def __init__(self, app):
+    def __init__(self, app, index=None):
         super(TopLevelWidgetsFinder, self).__init__()
         self._app = app
+        self._index = index
 
     def is_satisfied(self):
         return True
 
     def widgets(self):
-        return tuple(self._root_windows)
+        return self._root_windows
+
+    def indexed_descendants(self, widget_type, name=None, any_order=False):
+        if self._index is None:
+            return None
+        return self._index.descendants_of_type(widget_type, name, any_order)
 
     def test(self):
-        self._root_windows = set()
-        for top_level_widget in self._app.topLevelWidgets():
-            self._root_windows.add(self._root_parent(top_level_widget))
+        if self._index is not None:
+            self._root_windows = tuple(self._index.roots())
+            return
+
+        self._root_windows = tuple(_unique(self._root_parent(widget) for widget in self._app.topLevelWidgets()))
 
     def describe_to(self, description):
         description.append_text('all top level widgets')
@@ -86,8 +364,15 @@ class SingleWidgetFinder(WidgetSelector):
     def is_satisfied(self):
         return self._finder.is_satisfied() & self._is_single()
 
+    def is_impossible(self):
+        return self._finder.is_impossible()
+
     def test(self):
-        self._finder.test()
+        # Finding a second widget is enough to tell the widget is not unique
+        self._finder.test_up_to(2, any_order=True)
+
+    def confirms(self, widget):
+        return self._finder.confirms(widget)
 
     def widgets(self):
         return self._finder.widgets()
@@ -100,7 +385,9 @@ class SingleWidgetFinder(WidgetSelector):
             self._finder.describe_failure_to(description)
         else:
             description.append_text("found ")
-            if self._widget_count() > 0:
+            if self._widget_count() > 1:
+                description.append_text("more than one")
+            elif self._widget_count() > 0:
                 description.append_description_of(self._widget_count())
             else:
                 description.append_text("no")
@@ -123,8 +410,11 @@ class MissingWidgetFinder(WidgetFinder):
     def is_satisfied(self):
         return self._finder.is_satisfied() and self._is_missing()
 
+    def is_impossible(self):
+        return self._finder.is_impossible()
+
     def test(self):
-        self._finder.test()
+        self._finder.test_up_to(1, any_order=True)
 
     def widgets(self):
         return self._finder.widgets()
@@ -139,27 +429,102 @@ class MissingWidgetFinder(WidgetFinder):
         return len(self.widgets()) == 0
 
 
+class PinnedSelector(WidgetSelector):
+    """
+    Holds on to the widget found by a selector, as long as it is not destroyed, it is not reparented - nor are its
+    ancestors - and it still meets the criteria of the selector. The selector then searches for the widget again.
+
+    While pinned, a unique widget stays unique even if other widgets that meet the criteria show up.
+    """
+
+    def __init__(self, selector):
+        super(PinnedSelector, self).__init__()
+        self.selector = selector
+        self._pin = None
+
+    def is_satisfied(self):
+        return self._is_pinned() or self.selector.is_satisfied()
+
+    def is_impossible(self):
+        return not self._is_pinned() and self.selector.is_impossible()
+
+    def widgets(self):
+        return (self._pin.widget,) if self._is_pinned() else self.selector.widgets()
+
+    def test(self):
+        if self._is_pinned() and self.selector.confirms(self._pin.widget):
+            return
+
+        self._pin = None
+        self.selector.test()
+        if self.selector.is_satisfied() and len(self.selector.widgets()) == 1:
+            self._pin = _Pin(self.selector.widgets()[0])
+
+    def describe_to(self, description):
+        self.selector.describe_to(description)
+
+    def describe_failure_to(self, description):
+        self.selector.describe_failure_to(description)
+
+    def _is_pinned(self):
+        return self._pin is not None and self._pin.holds
+
+
+class _Pin(QObject):
+    def __init__(self, widget):
+        super(_Pin, self).__init__()
+        self.widget = widget
+        self.holds = True
+        widget.destroyed.connect(self._release)
+        ancestor = widget
+        while ancestor is not None:
+            ancestor.installEventFilter(self)
+            ancestor = ancestor.parent()
+
+    def eventFilter(self, target, event):
+        if event.type() == QEvent.ParentChange:
+            self._release()
+        return False
+
+    def _release(self, *_):
+        self.holds = False
+
+
 class WidgetIdentity(WidgetSelector):
     def __init__(self, widget, description=None):
         self._widget = widget
         self._description = description
+        self._destroyed = False
+        if widget is not None:
+            # Once destroyed, the widget can no longer tell its name
+            self._description = description or widget.objectName()
+            widget.destroyed.connect(self._widget_destroyed)
+
+    def _widget_destroyed(self):
+        self._destroyed = True
 
     def test(self):
         pass
 
     def widgets(self):
-        return self._widget,
+        return () if self._destroyed else (self._widget,)
 
     def is_satisfied(self):
-        return True
+        return not self._destroyed
+
+    def is_impossible(self):
+        return self._destroyed
 
     def describe_to(self, description):
         description.append_text('the exact ') \
             .append_text(type(self._widget).__name__) \
-            .append_text(" '{0}'".format(self._description or self._widget.objectName()))
+            .append_text(" '{0}'".format(self._description))
 
     def describe_failure_to(self, description):
-        pass
+        if self._destroyed:
+            description.append_text('the exact ') \
+                .append_text(type(self._widget).__name__) \
+                .append_text(" '{0}' was destroyed".format(self._description))
 
 
 class NthWidgetFinder(WidgetSelector):
@@ -170,7 +535,7 @@ class NthWidgetFinder(WidgetSelector):
 
     def widgets(self):
         widgets = self._finder.widgets()
-        if widgets:
+        if len(widgets) > self._index:
             return widgets[self._index],
         else:
             return ()
@@ -191,5 +556,8 @@ class NthWidgetFinder(WidgetSelector):
     def is_satisfied(self):
         return self._finder.is_satisfied() and len(self._finder.widgets()) > self._index
 
+    def is_impossible(self):
+        return self._finder.is_impossible()
+
     def test(self):
-        self._finder.test()
+        self._finder.test_up_to(self._index + 1)
@@ -59,6 +59,7 @@ class Automaton(GesturePerformer):
         pass
 
     def delay(self, ms):
+        """Waits for the given duration, returning how late it returned, in ms"""
         pass
 
 
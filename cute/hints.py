@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+FORMAT_VERSION = 1
+
+
+class PathHints:
+    """
+    Remembers the path - class, object name and child index at each level - from a root to the widget finders
+    resolved, so that they can walk straight down that path first on later runs. A hint that no longer leads to
+    a widget meeting the criteria of its finder is stale, and is forgotten until the finder searches again.
+
+    Hints are only recorded by finders that found a single widget while searching for more, and only looked up by
+    finders that stop at the first widget they find - such as finders asserting no widget is there - as any widget
+    meeting the criteria then does. A hit spares these finders the search altogether. Finders that need several
+    widgets, or need to tell a widget is unique, always search.
+    """
+
+    def __init__(self, filename=None):
+        self._filename = filename
+        self._paths = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        if filename is not None and os.path.exists(filename):
+            self._load()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses + self.stale
+        return self.hits / lookups if lookups else 0
+
+    def lookup(self, key, roots, confirm):
+        """Returns the widget the hint for the key leads to, if the widget is confirmed, or None"""
+        path = self._paths.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+
+        widget = _follow(path, roots)
+        if widget is None or not confirm(widget):
+            self.stale += 1
+            del self._paths[key]
+            return None
+
+        self.hits += 1
+        return widget
+
+    def record(self, key, roots, widget):
+        path = _path_of(widget, roots)
+        if path is not None:
+            self._paths[key] = path
+
+    def save(self):
+        if self._filename is None:
+            return
+        with open(self._filename, "w") as hints_file:
+            json.dump({"version": FORMAT_VERSION, "paths": self._paths}, hints_file, indent=2, sort_keys=True)
+
+    def _load(self):
+        try:
+            with open(self._filename) as hints_file:
+                content = json.load(hints_file)
+        except ValueError:
+            return
+        # Hints are only ever a shortcut, so hints we cannot read are simply dropped
+        if content.get("version") == FORMAT_VERSION:
+            self._paths = content.get("paths", {})
+
+
+def _path_of(widget, roots):
+    steps = []
+    while widget not in roots:
+        parent = widget.parent()
+        if parent is None:
+            return None
+        steps.append(_step_to(widget, parent.children()))
+        widget = parent
+    steps.append(_step_to(widget, roots))
+    return list(reversed(steps))
+
+
+def _step_to(widget, siblings):
+    return [type(widget).__name__, widget.objectName(), list(siblings).index(widget)]
+
+
+def _follow(path, roots):
+    widget, siblings = None, roots
+    for class_name, name, index in path:
+        widget = _pick(siblings, class_name, name, index)
+        if widget is None:
+            return None
+        siblings = widget.children()
+    return widget
+
+
+def _pick(siblings, class_name, name, index):
+    def is_expected(sibling):
+        return type(sibling).__name__ == class_name and sibling.objectName() == name
+
+    # Names survive siblings being added or removed, indexes do not
+    if name:
+        named = [sibling for sibling in siblings if is_expected(sibling)]
+        if len(named) == 1:
+            return named[0]
+    if index < len(siblings) and is_expected(siblings[index]):
+        return siblings[index]
+    return None
+
+
+_installed_hints = None
+
+
+def install(filename=None):
+    """
+    Installs hints that all widget finders record to and look up from.
+    Hints are read from the given file, if it exists, and saved back to it once uninstalled.
+    """
+    global _installed_hints
+    uninstall()
+    _installed_hints = PathHints(filename)
+    return _installed_hints
+
+
+def uninstall():
+    global _installed_hints
+    if _installed_hints is not None:
+        _installed_hints.save()
+    _installed_hints = None
+
+
+def installed():
+    return _installed_hints
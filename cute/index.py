@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QEvent, Qt, pyqtSlot
+
+
+class _Entry(object):
+    __slots__ = ("object", "root", "parent", "children", "types", "name")
+
+    def __init__(self, obj, root, parent):
+        self.object = obj
+        self.root = root
+        self.parent = parent
+        self.children = set()
+        self.types = type(obj).__mro__
+        self.name = obj.objectName()
+
+
+class WidgetIndex(QObject):
+    """
+    An application-wide index of all objects in the widget trees, keyed by each class of their hierarchy
+    and by object name.
+
+    The index is built once, then kept up to date: subtrees are indexed when added to an indexed object and
+    dropped when removed, and objects are keyed again when renamed. A child is never touched while Qt reports
+    it added, as it might still be under construction. Its parent is reconciled on the next query instead.
+    """
+
+    def __init__(self, app):
+        super(WidgetIndex, self).__init__()
+        self._app = app
+        self._entries = {}
+        self._by_type = {}
+        self._by_name = {}
+        self._top_level_widgets = {}
+        self._roots = ()
+        self._roots_changed = True
+        self._unreconciled = set()
+        self.objects_indexed = 0
+
+    def install(self):
+        self._roots_changed = True
+        self._app.installEventFilter(self)
+
+    def uninstall(self):
+        self._app.removeEventFilter(self)
+
+    def eventFilter(self, target, event):
+        if event.type() == QEvent.ChildAdded:
+            if id(target) in self._entries:
+                self._unreconciled.add(id(target))
+        elif event.type() == QEvent.ChildRemoved:
+            # The child might be under destruction, so only its entry is looked up
+            self._remove(id(event.child()))
+        elif event.type() == QEvent.ParentChange:
+            self._roots_changed = True
+        return False
+
+    def roots(self):
+        self._refresh()
+        return self._roots
+
+    def descendants_of_type(self, object_type, name=None, any_order=False):
+        """
+        Returns (root, object) pairs for all objects of the given type - and name, if any - found below the roots.
+        The pairs are in tree order, unless any order will do.
+        """
+        self._refresh()
+        if name is None:
+            entries = [entry for entry in self._by_type.get(object_type, {}).values() if entry.parent is not None]
+        else:
+            entries = [entry for entry in self._by_name.get(name, {}).values()
+                       if entry.parent is not None and object_type in entry.types]
+        if not any_order:
+            entries.sort(key=_TreeOrder(self._roots).key)
+        return [(entry.root, entry.object) for entry in entries]
+
+    def _refresh(self):
+        top_level_widgets = self._app.topLevelWidgets()
+        if self._roots_changed or len(top_level_widgets) != len(self._top_level_widgets) or \
+                any(id(widget) not in self._top_level_widgets for widget in top_level_widgets):
+            self._update_roots(top_level_widgets)
+        while self._unreconciled:
+            self._reconcile(self._unreconciled.pop())
+
+    def _update_roots(self, top_level_widgets):
+        self._roots_changed = False
+        self._top_level_widgets = dict((id(widget), widget) for widget in top_level_widgets)
+        roots = tuple(OrderedDict.fromkeys(_root_parent(widget) for widget in top_level_widgets))
+        for root in self._roots:
+            if root not in roots:
+                self._remove(id(root))
+        for root in roots:
+            entry = self._entries.get(id(root))
+            if entry is None or entry.root is not root:
+                self._remove(id(root))
+                self._add_tree(root, None)
+        self._roots = roots
+
+    def _reconcile(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        for child in entry.object.children():
+            if id(child) not in entry.children:
+                # A child moved in from elsewhere in the trees is indexed again under its new parent
+                self._remove(id(child))
+                self._add_tree(child, entry)
+
+    def _add_tree(self, obj, parent_entry):
+        root = obj if parent_entry is None else parent_entry.root
+        self._add(obj, root, parent_entry)
+        for descendant in obj.findChildren(QObject):
+            self._add(descendant, root, self._entries[id(descendant.parent())])
+
+    def _add(self, obj, root, parent_entry):
+        entry = _Entry(obj, root, parent_entry)
+        key = id(obj)
+        self._entries[key] = entry
+        if parent_entry is not None:
+            parent_entry.children.add(key)
+        for object_type in entry.types:
+            self._by_type.setdefault(object_type, OrderedDict())[key] = entry
+        self._by_name.setdefault(entry.name, OrderedDict())[key] = entry
+        try:
+            obj.objectNameChanged.connect(self._rename, Qt.UniqueConnection)
+        except TypeError:
+            pass  # Still connected from the last time the object was indexed
+        self.objects_indexed += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.parent is not None:
+            entry.parent.children.discard(key)
+        self._remove_tree(key, entry)
+
+    def _remove_tree(self, key, entry):
+        for object_type in entry.types:
+            del self._by_type[object_type][key]
+        del self._by_name[entry.name][key]
+        for child in entry.children:
+            self._remove_tree(child, self._entries.pop(child))
+
+    @pyqtSlot(str)
+    def _rename(self, name):
+        key = id(self.sender())
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        del self._by_name[entry.name][key]
+        entry.name = name
+        self._by_name.setdefault(name, OrderedDict())[key] = entry
+
+
+class _TreeOrder(object):
+    """Sorts objects by their position in the trees, looking up the children of each parent only once"""
+
+    def __init__(self, roots):
+        self._roots = dict((id(root), position) for position, root in enumerate(roots))
+        self._siblings = {}
+
+    def key(self, entry):
+        path = []
+        obj = entry.object
+        while obj is not entry.root:
+            parent = obj.parent()
+            path.append(self._position_among_siblings(obj, parent))
+            obj = parent
+        path.append(self._roots[id(entry.root)])
+        path.reverse()
+        return path
+
+    def _position_among_siblings(self, obj, parent):
+        siblings = self._siblings.get(id(parent))
+        if siblings is None:
+            siblings = self._siblings[id(parent)] = dict((id(child), position)
+                                                         for position, child in enumerate(parent.children()))
+        return siblings[id(obj)]
+
+
+def _root_parent(widget):
+    return widget if not widget.parent() else _root_parent(widget.parent())
+
+
+_installed_index = None
+
+
+def install(app):
+    """Installs an index that all top level widget finders created afterwards will answer from"""
+    global _installed_index
+    uninstall()
+    _installed_index = WidgetIndex(app)
+    _installed_index.install()
+    return _installed_index
+
+
+def uninstall():
+    global _installed_index
+    if _installed_index is not None:
+        _installed_index.uninstall()
+    _installed_index = None
+
+
+def installed():
+    return _installed_index
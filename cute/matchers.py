@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
+import re
+from operator import itemgetter
+
+from PyQt5.QtCore import QRegularExpression
 from hamcrest import anything, all_of
 from hamcrest.core.base_matcher import BaseMatcher
+from hamcrest.core.core.allof import AllOf
+from hamcrest.core.core.anyof import AnyOf
+from hamcrest.core.core.described_as import DescribedAs
+from hamcrest.core.core.isanything import IsAnything
+from hamcrest.core.core.isequal import IsEqual
 from hamcrest.core.helpers.wrap_matcher import wrap_matcher
+from hamcrest.library.text.stringmatches import StringMatchesPattern
 
 from . import properties
 
 
 def named(name):
-    return with_(properties.name(), name)
+    return ObjectNameMatcher(name)
 
 
 def with_buddy(buddy):
@@ -74,14 +84,50 @@ def active_window():
     return StateMatcher(lambda w: w.isActiveWindow(), "ready", "not ready")
 
 
-class QueryResultMatcher(BaseMatcher):
+class EvaluatingMatcher(BaseMatcher):
+    """
+    Matches a value it evaluates from the item - such as a property or the cells of a table - and remembers the last
+    one, so that a mismatch is described with the value that actually failed, without evaluating it again.
+    Only the last evaluation is kept.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._last_evaluation = None
+
+    def evaluate(self, item):
+        pass
+
+    def value_of(self, item):
+        value = self.evaluate(item)
+        self._last_evaluation = (item, value)
+        return value
+
+    def last_value_of(self, item):
+        if self._last_evaluation is not None and self._last_evaluation[0] is item:
+            return self._last_evaluation[1]
+        return self.evaluate(item)
+
+
+class QueryResultMatcher(EvaluatingMatcher):
     def __init__(self, query, matcher):
         super().__init__()
         self._query = query
         self._result_matcher = wrap_matcher(matcher)
 
+    @property
+    def query(self):
+        return self._query
+
+    @property
+    def result_matcher(self):
+        return self._result_matcher
+
+    def evaluate(self, widget):
+        return self._query(widget)
+
     def _matches(self, widget):
-        return widget is not None and self._result_matcher.matches(self._query(widget))
+        return widget is not None and self._result_matcher.matches(self.value_of(widget))
 
     def describe_to(self, description):
         description.append_text("with ") \
@@ -94,7 +140,108 @@ class QueryResultMatcher(BaseMatcher):
             mismatch_description.append_text("was ").append_description_of(widget)
         else:
             mismatch_description.append_description_of(self._query).append_text(" ")
-            self._result_matcher.describe_mismatch(self._query(widget), mismatch_description)
+            self._result_matcher.describe_mismatch(self.last_value_of(widget), mismatch_description)
+
+
+class ObjectNameMatcher(QueryResultMatcher):
+    """
+    Matches widgets on their object name. Equality and regular expression criteria
+    can be handed over to Qt to look up children natively.
+    """
+
+    def __init__(self, matcher):
+        super().__init__(properties.name(), matcher)
+
+    @property
+    def exact_name(self):
+        if isinstance(self._result_matcher, IsEqual) and isinstance(self._result_matcher.object, str):
+            return self._result_matcher.object or None
+        return None
+
+    @property
+    def name_pattern(self):
+        if isinstance(self._result_matcher, StringMatchesPattern):
+            pattern = re.compile(self._result_matcher.pattern)
+            if pattern.flags == re.UNICODE:
+                # Python classes such as \d or \w match any Unicode character of their kind, unlike Qt's by default
+                return QRegularExpression(pattern.pattern, QRegularExpression.UseUnicodePropertiesOption)
+        return None
+
+
+class NameLookup:
+    """
+    What finders can ask Qt to look up natively among the criteria: an exact name or a name pattern.
+    The remaining criteria still have to be matched against the widgets Qt returns.
+    """
+
+    def __init__(self, criteria):
+        self.name, self.pattern, self.remaining_criteria = None, None, criteria
+
+        for matcher in _conjunction_of(criteria):
+            if isinstance(matcher, ObjectNameMatcher) and matcher.exact_name is not None:
+                self.name = matcher.exact_name
+                self.remaining_criteria = all_of(*[other for other in _conjunction_of(criteria) if other is not matcher])
+                return
+
+        for matcher in _conjunction_of(criteria):
+            if isinstance(matcher, ObjectNameMatcher) and matcher.name_pattern is not None:
+                # Regular expression dialects differ slightly, so the pattern is matched again in Python
+                self.pattern = matcher.name_pattern
+                return
+
+    @property
+    def native_argument(self):
+        return self.name if self.name is not None else self.pattern
+
+    def matches_name(self, widget):
+        return self.name is None or widget.objectName() == self.name
+
+
+def compile_matcher(matcher):
+    """
+    Compiles a matcher into a flat predicate that evaluates cheap checks - such as names or states - before
+    expensive ones - such as pixmaps or children. Matchers are only asked for descriptions to report failures.
+    """
+    return _compile(matcher)[0]
+
+
+def _compile(matcher):
+    """Returns the predicate for the matcher, along with its cost"""
+    if isinstance(matcher, (AllOf, AnyOf)):
+        compiled = sorted((_compile(each) for each in matcher.matchers), key=itemgetter(1))
+        predicates = tuple(predicate for predicate, _ in compiled)
+        cost = sum(cost for _, cost in compiled)
+        if isinstance(matcher, AllOf):
+            return (lambda item: all(predicate(item) for predicate in predicates)), cost
+        return (lambda item: any(predicate(item) for predicate in predicates)), cost
+    if isinstance(matcher, DescribedAs):
+        return _compile(matcher.matcher)
+    if isinstance(matcher, IsAnything):
+        return (lambda item: True), properties.CHEAP
+    if isinstance(matcher, StateMatcher):
+        return matcher.state, properties.MODERATE
+    if isinstance(matcher, QueryResultMatcher):
+        return _compile_query_result(matcher)
+    if isinstance(matcher, ChildrenOfTypeMatcher):
+        return (lambda item: matcher.matcher.matches(matcher.value_of(item))), properties.EXPENSIVE
+    return matcher.matches, properties.MODERATE
+
+
+def _compile_query_result(matcher):
+    # The value is still evaluated through the matcher, which remembers it to describe a mismatch
+    query_cost = getattr(matcher.query, "cost", properties.MODERATE)
+    if isinstance(matcher.result_matcher, IsEqual):
+        expected = matcher.result_matcher.object
+        return (lambda item: item is not None and matcher.value_of(item) == expected), query_cost
+
+    matches_result, result_cost = _compile(matcher.result_matcher)
+    return (lambda item: item is not None and matches_result(matcher.value_of(item))), query_cost + result_cost
+
+
+def _conjunction_of(matcher):
+    if isinstance(matcher, AllOf):
+        return [conjunct for each in matcher.matchers for conjunct in _conjunction_of(each)]
+    return [matcher]
 
 
 class StateMatcher(BaseMatcher):
@@ -104,6 +251,10 @@ class StateMatcher(BaseMatcher):
         self._state_description = description
         self._opposite_state_description = opposite_description
 
+    @property
+    def state(self):
+        return self._state
+
     def _matches(self, widget):
         return self._state(widget)
 
@@ -114,17 +265,20 @@ class StateMatcher(BaseMatcher):
         mismatch_description.append_text("was ").append_text(self._opposite_state_description)
 
 
-class ChildrenOfTypeMatcher(BaseMatcher):
+class ChildrenOfTypeMatcher(EvaluatingMatcher):
     def __init__(self, type_, matcher):
         super().__init__()
         self.matcher = matcher
         self.type = type_
 
+    def evaluate(self, widget):
+        return widget.findChildren(self.type)
+
     def _matches(self, widget):
-        return self.matcher.matches(widget.findChildren(self.type))
+        return self.matcher.matches(self.value_of(widget))
 
     def describe_to(self, description):
         description.append_text("with children of type ").append_value(self.type).append_text(" ").append(self.matcher)
 
     def describe_mismatch(self, widget, mismatch_description):
-        self.matcher.describe_mismatch(widget.findChildren(self.type), mismatch_description)
+        self.matcher.describe_mismatch(self.last_value_of(widget), mismatch_description)
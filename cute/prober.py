@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
+import random
+import sys
+import traceback
+from contextlib import contextmanager
 
+from PyQt5.QtCore import QCoreApplication, qInstallMessageHandler, QtCriticalMsg, QtFatalMsg
 from hamcrest.core.selfdescribing import SelfDescribing
 from hamcrest.core.string_description import StringDescription
 
-from . import event_loop
-from cute.event_loop import Timeout
+from cute.event_loop import Timeout, ChangeWatcher, RealClock, ONE_SECOND_IN_MILLIS
 
 DEFAULT_POLL_DELAY = 25
 DEFAULT_POLL_TIMEOUT = 1000
+DEFAULT_FALLBACK_DELAY = 100
+DEFAULT_INITIAL_DELAY = 1
+DEFAULT_BACKOFF_FACTOR = 2
+DEFAULT_JITTER = 0.5
 
 
 class Probe(SelfDescribing):
@@ -17,6 +25,14 @@ class Probe(SelfDescribing):
     def is_satisfied(self):
         pass
 
+    def is_impossible(self):
+        """Tells whether the probe can no longer be satisfied, however long we wait"""
+        return False
+
+    def release(self):
+        """Releases what the probe holds on to - such as signal connections - once its check ends, satisfied or not"""
+        pass
+
     def describe_to(self, description):
         pass
 
@@ -26,39 +42,370 @@ class Probe(SelfDescribing):
 
 class Prober(object):
     def check(self, probe):
+        """Checks the probe, or defers it to the end of the current batch if one is open"""
+        pass
+
+    def check_now(self, probe):
+        """Checks the probe right away, even if a batch is open"""
+        pass
+
+    def check_all(self, *probes):
         pass
 
+    def batch(self):
+        pass
+
+    def budget(self, duration_in_ms):
+        pass
+
+    def spending(self, activity):
+        pass
+
+
+_tested_probes = None
+
+
+def run_test_once(probe):
+    """
+    Tests the probe, unless it was already tested within the current poll.
+    Finder chains shared by several probes are then resolved once per poll, and never reused afterwards.
+    """
+    if _tested_probes is None:
+        probe.test()
+    elif id(probe) not in _tested_probes:
+        probe.test()
+        # Holding on to the probe guarantees its id is not reused within the poll
+        _tested_probes[id(probe)] = probe
+
+
+@contextmanager
+def _single_poll():
+    global _tested_probes
+    if _tested_probes is not None:
+        yield
+        return
+
+    _tested_probes = {}
+    try:
+        yield
+    finally:
+        _tested_probes = None
+
+
+class AllProbes(Probe):
+    """
+    Polls several probes at once. Selectors shared by the probes are resolved once per poll.
+    """
+
+    def __init__(self, probes):
+        super(AllProbes, self).__init__()
+        self._probes = probes
+
+    def test(self):
+        for probe in self._probes:
+            run_test_once(probe)
+
+    def is_satisfied(self):
+        return all(probe.is_satisfied() for probe in self._probes)
+
+    def is_impossible(self):
+        return any(probe.is_impossible() for probe in self._probes)
 
-def _describe_failure_of(probe):
+    def release(self):
+        for probe in self._probes:
+            probe.release()
+
+    def describe_to(self, description):
+        for index, probe in enumerate(self._probes):
+            if index > 0:
+                description.append_text("\nand ")
+            description.append_description_of(probe)
+
+    def describe_failure_to(self, description):
+        for index, probe in enumerate(self._unsatisfied_probes()):
+            if index > 0:
+                description.append_text("\nand ")
+            probe.describe_failure_to(description)
+
+    def _unsatisfied_probes(self):
+        return [probe for probe in self._probes if not probe.is_satisfied()]
+
+
+class FirstOf(Probe):
+    """
+    Polls alternative outcomes at once, until one of them is satisfied.
+    The satisfied alternative - the first one given if several are satisfied in the same poll - is then available.
+    """
+
+    def __init__(self, probes):
+        super(FirstOf, self).__init__()
+        self._probes = probes
+        self.satisfied_probe = None
+
+    def test(self):
+        for probe in self._probes:
+            run_test_once(probe)
+        self.satisfied_probe = next((probe for probe in self._probes if probe.is_satisfied()), None)
+
+    def is_satisfied(self):
+        return self.satisfied_probe is not None
+
+    def is_impossible(self):
+        return all(probe.is_impossible() for probe in self._probes)
+
+    def release(self):
+        for probe in self._probes:
+            probe.release()
+
+    def describe_to(self, description):
+        description.append_text("either ")
+        for index, probe in enumerate(self._probes):
+            if index > 0:
+                description.append_text("\nor ")
+            description.append_description_of(probe)
+
+    def describe_failure_to(self, description):
+        for index, probe in enumerate(self._probes):
+            if index > 0:
+                description.append_text("\nand ")
+            probe.describe_failure_to(description)
+
+
+def first_of(*probes):
+    return FirstOf(probes)
+
+
+def _describe_failure_of(probe, budget=None, errors=()):
     description = StringDescription()
     description.append_text('\nTried to look for...\n  ')
     probe.describe_to(description)
     description.append_text('\nbut...\n  ')
     probe.describe_failure_to(description)
+    if budget is not None:
+        description.append_text('\nwhile ').append_description_of(budget)
+    for error in errors:
+        description.append_text('\nand the application reported:\n').append_text(error)
     return str(description)
 
 
+def _summary_of(probe):
+    description = StringDescription()
+    probe.describe_to(description)
+    return str(description).split("\n")[0]
+
+
+class Budget(SelfDescribing):
+    """
+    A deadline shared by all the checks and gestures of a scenario, which keeps track of where the time went.
+    """
+
+    def __init__(self, duration_in_ms, clock):
+        self._duration = duration_in_ms
+        self._timeout = Timeout(duration_in_ms, clock)
+        self._spending = []
+
+    def remaining_time(self):
+        return self._timeout.remaining_time()
+
+    def has_expired(self):
+        return self._timeout.has_expired()
+
+    def spend(self, activity, ms):
+        self._spending.append((activity, ms))
+
+    def describe_to(self, description):
+        description.append_text("running on a budget of {0:.0f}ms, spent".format(self._duration))
+        for activity, ms in self._spending:
+            description.append_text("\n    {0:.0f}ms to {1}".format(ms, activity))
+
+
+class ApplicationErrors(object):
+    """
+    Captures exceptions raised from slots and critical Qt messages, while installed.
+    """
+
+    def __init__(self):
+        self.reports = []
+        self._previous_excepthook = None
+        self._previous_message_handler = None
+
+    def install(self):
+        self.reports = []
+        self._previous_excepthook, sys.excepthook = sys.excepthook, self._exception_raised
+        self._previous_message_handler = qInstallMessageHandler(self._message_logged)
+
+    def uninstall(self):
+        sys.excepthook = self._previous_excepthook
+        qInstallMessageHandler(self._previous_message_handler)
+
+    def _exception_raised(self, exception_type, exception, trace):
+        self.reports.append("".join(traceback.format_exception(exception_type, exception, trace)))
+
+    def _message_logged(self, message_type, context, message):
+        if message_type in (QtCriticalMsg, QtFatalMsg):
+            self.reports.append(message)
+        if self._previous_message_handler is not None:
+            self._previous_message_handler(message_type, context, message)
+        else:
+            sys.stderr.write(message + "\n")
+
+
+class PollSchedule(object):
+    def delays(self):
+        """Yields the successive delays to wait between two polls, in ms"""
+        pass
+
+
+class ConstantDelay(PollSchedule):
+    def __init__(self, delay):
+        self._delay = delay
+
+    def delays(self):
+        while True:
+            yield self._delay
+
+
+class ExponentialBackoff(PollSchedule):
+    """
+    Polls again right away, then waits longer and longer between polls, up to a maximum delay.
+    """
+
+    def __init__(self, initial_delay, factor, max_delay):
+        self._initial_delay = initial_delay
+        self._factor = factor
+        self._max_delay = max_delay
+
+    def delays(self):
+        yield 0
+        delay = self._initial_delay
+        while True:
+            yield min(delay, self._max_delay)
+            delay *= self._factor
+
+
+class Jittered(PollSchedule):
+    def __init__(self, schedule, jitter):
+        self._schedule = schedule
+        self._jitter = jitter
+
+    def delays(self):
+        for delay in self._schedule.delays():
+            yield delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+
+def constant_delay(ms=DEFAULT_POLL_DELAY):
+    return ConstantDelay(ms)
+
+
+def exponential_backoff(initial_delay=DEFAULT_INITIAL_DELAY, factor=DEFAULT_BACKOFF_FACTOR,
+                        max_delay=DEFAULT_POLL_DELAY):
+    return ExponentialBackoff(initial_delay, factor, max_delay)
+
+
+def jittered(schedule, jitter=DEFAULT_JITTER):
+    return Jittered(schedule, jitter)
+
+
 class PollingProber(Prober):
-    def __init__(self, poll_delay=DEFAULT_POLL_DELAY, timeout=DEFAULT_POLL_TIMEOUT):
+    def __init__(self, poll_delay=DEFAULT_POLL_DELAY, timeout=DEFAULT_POLL_TIMEOUT, schedule=None):
         super(PollingProber, self).__init__()
-        self._poll_delay = poll_delay
         self._poll_timeout = timeout
+        self._schedule = schedule or constant_delay(poll_delay)
+        # Timeouts are measured in real time, since that is the time the timers of the application take to fire
+        self._clock = RealClock()
+        self._batch = None
+        self._budget = None
 
     def check(self, probe):
-        if not self._poll(probe):
-            raise AssertionError(_describe_failure_of(probe))
+        if self._batch is not None:
+            self._batch.append(probe)
+        else:
+            self.check_now(probe)
+
+    def check_now(self, probe):
+        with self.spending("check " + _summary_of(probe)):
+            try:
+                satisfied = self._poll(probe)
+            finally:
+                probe.release()
+        if not satisfied:
+            raise AssertionError(self._describe_failure_of(probe))
+
+    def check_all(self, *probes):
+        self.check(AllProbes(probes))
+
+    @contextmanager
+    def batch(self):
+        """
+        Defers checks issued within the batch, then checks them all together.
+        Nested batches join the outermost one.
+        """
+        if self._batch is not None:
+            yield
+            return
+
+        self._batch = []
+        try:
+            yield
+        finally:
+            probes, self._batch = self._batch, None
+        self.check_all(*probes)
+
+    @contextmanager
+    def budget(self, duration_in_ms):
+        """
+        Shares a deadline between all checks and gestures issued within the budget.
+        Each check waits at most for the time left, and failures report where the time went.
+        """
+        outer_budget = self._budget
+        if outer_budget is not None:
+            duration_in_ms = min(duration_in_ms, outer_budget.remaining_time())
+
+        with self.spending("run a nested budget"):
+            self._budget = Budget(duration_in_ms, self._clock)
+            try:
+                yield self._budget
+            finally:
+                self._budget = outer_budget
+
+    @contextmanager
+    def spending(self, activity):
+        """Charges the time spent within to the current budget, if any"""
+        budget = self._budget
+        if budget is None:
+            yield
+            return
+
+        start_time = self._clock.time()
+        try:
+            yield
+        finally:
+            budget.spend(activity, (self._clock.time() - start_time) * ONE_SECOND_IN_MILLIS)
 
     def _poll(self, probe):
-        timeout = Timeout(self._poll_timeout)
+        timeout = Timeout(self._poll_timeout_within_budget(), self._clock)
+        delays = self._schedule.delays()
 
         while True:
-            self._run_probe(probe)
+            with _single_poll():
+                self._run_probe(probe)
 
             if probe.is_satisfied():
                 return True
-            if timeout.has_expired():
+            if timeout.has_expired() or probe.is_impossible() or self._has_aborted():
                 return False
-            self._wait_for(self._poll_delay)
+            self._wait_for(min(next(delays), timeout.remaining_time()))
+
+    def _poll_timeout_within_budget(self):
+        if self._budget is None:
+            return self._poll_timeout
+        return min(self._poll_timeout, self._budget.remaining_time())
+
+    def _has_aborted(self):
+        return False
+
+    def _describe_failure_of(self, probe):
+        return _describe_failure_of(probe, self._budget)
 
     def _run_probe(self, probe):
         pass
@@ -68,12 +415,62 @@ class PollingProber(Prober):
 
 
 class EventProcessingProber(PollingProber):
-    def __init__(self, delay_in_ms=DEFAULT_POLL_DELAY, timeout_in_ms=DEFAULT_POLL_TIMEOUT):
-        super(EventProcessingProber, self).__init__(delay_in_ms, timeout_in_ms, )
+    """
+    When failing on errors, exceptions raised from slots and critical Qt messages end the current check right away,
+    and are reported along with the failure.
+    """
+
+    def __init__(self, delay_in_ms=DEFAULT_POLL_DELAY, timeout_in_ms=DEFAULT_POLL_TIMEOUT, schedule=None,
+                 fail_on_errors=False):
+        super(EventProcessingProber, self).__init__(delay_in_ms, timeout_in_ms, schedule)
+        self._errors = ApplicationErrors() if fail_on_errors else None
+
+    def _poll(self, probe):
+        if self._errors is None:
+            return super(EventProcessingProber, self)._poll(probe)
+
+        self._errors.install()
+        try:
+            return super(EventProcessingProber, self)._poll(probe)
+        finally:
+            self._errors.uninstall()
+
+    def _has_aborted(self):
+        return self._errors is not None and len(self._errors.reports) > 0
+
+    def _describe_failure_of(self, probe):
+        errors = self._errors.reports if self._errors is not None else ()
+        return _describe_failure_of(probe, self._budget, errors)
 
     def _run_probe(self, probe):
         probe.test()
 
     def _wait_for(self, ms):
-        event_loop.process_events_for(ms)
+        return self._clock.wait(ms)
+
 
+class EventDrivenProber(EventProcessingProber):
+    """
+    Re-evaluates probes as soon as the application receives an event that might affect them,
+    rather than on a fixed delay. The fallback delay only guards against changes that no watched event reports.
+
+    Signals that do not translate into events - such as model signals - can be watched explicitly.
+    """
+
+    def __init__(self, fallback_delay_in_ms=DEFAULT_FALLBACK_DELAY, timeout_in_ms=DEFAULT_POLL_TIMEOUT, app=None,
+                 fail_on_errors=False):
+        super(EventDrivenProber, self).__init__(fallback_delay_in_ms, timeout_in_ms, fail_on_errors=fail_on_errors)
+        self._watcher = ChangeWatcher(app or QCoreApplication.instance())
+
+    def watch(self, signal):
+        self._watcher.watch(signal)
+
+    def _poll(self, probe):
+        self._watcher.install()
+        try:
+            return super(EventDrivenProber, self)._poll(probe)
+        finally:
+            self._watcher.uninstall()
+
+    def _wait_for(self, ms):
+        self._watcher.wait_for_change(ms)
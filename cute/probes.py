@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
-from PyQt5.QtCore import QPoint, QRect
+import time
+from collections import deque, namedtuple
+
+from PyQt5.QtCore import QPoint, QRect, QCoreApplication, QTimer, QAbstractAnimation, QThreadPool, Qt
+from PyQt5.QtGui import QGuiApplication
 from hamcrest import described_as, none, empty
 from hamcrest.core.helpers.wrap_matcher import wrap_matcher
 
-from .prober import Probe
+from . import event_loop, properties
+from .matchers import compile_matcher
+from .prober import Probe, run_test_once
 
 
 class WidgetAssertionProbe(Probe):
@@ -11,17 +17,22 @@ class WidgetAssertionProbe(Probe):
         super(WidgetAssertionProbe, self).__init__()
         self._selector = selector
         self._assertion = assertion
+        self._meets_assertion = compile_matcher(assertion)
         self._assertion_met = False
 
     def test(self):
-        self._selector.test()
-        self._assertion_met = \
-            self._selector.is_satisfied() and \
-            self._assertion.matches(self._selector.widget())
+        with properties.snapshot():
+            run_test_once(self._selector)
+            self._assertion_met = \
+                self._selector.is_satisfied() and \
+                self._meets_assertion(self._selector.widget())
 
     def is_satisfied(self):
         return self._assertion_met
 
+    def is_impossible(self):
+        return self._selector.is_impossible()
+
     def describe_to(self, description):
         description.append_description_of(self._selector) \
             .append_text("\nand check that it ") \
@@ -43,13 +54,17 @@ class WidgetPropertyAssertionProbe(Probe):
         self._property_value = None
 
     def test(self):
-        self._selector.test()
-        if self._selector.is_satisfied():
-            self._property_value = self._property_value_query(self._selector.widget())
+        with properties.snapshot():
+            run_test_once(self._selector)
+            if self._selector.is_satisfied():
+                self._property_value = self._property_value_query(self._selector.widget())
 
     def is_satisfied(self):
         return self._selector.is_satisfied() and self._property_value_matcher.matches(self._property_value)
 
+    def is_impossible(self):
+        return self._selector.is_impossible()
+
     def describe_to(self, description):
         description.append_description_of(self._selector) \
             .append_text('\nand check that its ') \
@@ -83,8 +98,11 @@ class WidgetManipulatorProbe(Probe):
     def is_satisfied(self):
         return self._finder.is_satisfied()
 
+    def is_impossible(self):
+        return self._finder.is_impossible()
+
     def test(self):
-        self._finder.test()
+        run_test_once(self._finder)
         if self._finder.is_satisfied():
             for widget in self._finder.widgets():
                 self._manipulate(widget)
@@ -108,18 +126,148 @@ class WidgetScreenBoundsProbe(Probe):
     def is_satisfied(self):
         return self.bounds is not None and self.bounds.width() > 0 and self.bounds.height() > 0
 
+    def is_impossible(self):
+        return self._selector.is_impossible()
+
     def test(self):
-        self._selector.test()
+        run_test_once(self._selector)
 
         if not self._selector.is_satisfied():
             self.bounds = None
             return
 
-        widget = self._selector.widget()
-        if widget.isVisible():
-            self.bounds = QRect(widget.mapToGlobal(QPoint(0, 0)), widget.size())
+        self.bounds = screen_bounds_of(self._selector.widget())
+
+
+def screen_bounds_of(widget):
+    return QRect(widget.mapToGlobal(QPoint(0, 0)), widget.size()) if widget.isVisible() else None
+
+
+def screen_center_of(widget):
+    return within_screen_bounds(QRect.center)(widget)
+
+
+def within_screen_bounds(locate):
+    """Returns a function locating a point within the screen bounds of a widget, or None while it is not on screen"""
+    def locate_on(widget):
+        bounds = screen_bounds_of(widget)
+        return locate(bounds) if bounds is not None and not bounds.isEmpty() else None
+
+    return locate_on
+
+
+class WidgetGestureProbe(Probe):
+    """
+    Resolves the widget, verifies it meets the preconditions of the gesture, locates the point to perform the
+    gesture at and performs it, all within a single test. The widget cannot change between the checks and the gesture.
+    """
+
+    def __init__(self, selector, preconditions, locate, gesture, gesture_performer, description):
+        super(WidgetGestureProbe, self).__init__()
+        self._selector = selector
+        self._preconditions = preconditions
+        self._locate = locate
+        self._gesture = gesture
+        self._gesture_performer = gesture_performer
+        self._description = description
+        self._preconditions_met = False
+        self._point = None
+        self.performed = False
+
+    def test(self):
+        if self.performed:
+            return
+
+        run_test_once(self._selector)
+        self._preconditions_met = self._selector.is_satisfied() and \
+                                  self._preconditions.matches(self._selector.widget())
+        self._point = self._locate(self._selector.widget()) if self._preconditions_met else None
+        if self._point is not None:
+            self._gesture_performer.perform(self._gesture(self._point))
+            self.performed = True
+
+    def is_satisfied(self):
+        return self.performed
+
+    def is_impossible(self):
+        return self._selector.is_impossible()
+
+    def describe_to(self, description):
+        description.append_description_of(self._selector) \
+            .append_text("\nand check that it ") \
+            .append_description_of(self._preconditions) \
+            .append_text("\nand {0}".format(self._description))
+
+    def describe_failure_to(self, description):
+        self._selector.describe_failure_to(description)
+        if not self._selector.is_satisfied():
+            return
+
+        if not self._preconditions_met:
+            description.append_text("\n  it ")
+            self._preconditions.describe_mismatch(self._selector.widget(), description)
         else:
-            self.bounds = None
+            description.append_text("\n  had no point to {0}".format(self._description))
+
+
+SHORT_TIMER_INTERVAL = 500  # in ms
+BUSY_CURSOR_SHAPES = (Qt.WaitCursor, Qt.BusyCursor)
+
+
+class ApplicationIdleProbe(Probe):
+    """
+    A probe satisfied once the application has settled: no posted events waiting to be processed,
+    no short single shot timer about to fire, no running animation, no busy thread in the global pool
+    and no busy cursor.
+
+    Timers and animations are only found if they belong to the application or to one of its widgets.
+    """
+
+    def __init__(self, app):
+        super(ApplicationIdleProbe, self).__init__()
+        self._app = app
+        self._activities = []
+
+    def test(self):
+        self._activities = []
+        if QCoreApplication.hasPendingEvents():
+            self._activities.append("events were pending")
+
+        timers = [timer for timer in self._objects_of_type(QTimer) if self._is_short_timer(timer)]
+        if timers:
+            self._activities.append("{0} timer(s) were about to fire".format(len(timers)))
+
+        animations = [animation for animation in self._objects_of_type(QAbstractAnimation)
+                      if animation.state() == QAbstractAnimation.Running]
+        if animations:
+            self._activities.append("{0} animation(s) were running".format(len(animations)))
+
+        active_threads = QThreadPool.globalInstance().activeThreadCount()
+        if active_threads > 0:
+            self._activities.append("{0} thread(s) were busy".format(active_threads))
+
+        cursor = QGuiApplication.overrideCursor()
+        if cursor is not None and cursor.shape() in BUSY_CURSOR_SHAPES:
+            self._activities.append("cursor was busy")
+
+    def is_satisfied(self):
+        return not self._activities
+
+    def describe_to(self, description):
+        description.append_text("application to be idle")
+
+    def describe_failure_to(self, description):
+        description.append_text(", ".join(self._activities))
+
+    def _objects_of_type(self, object_type):
+        objects = self._app.findChildren(object_type)
+        for widget in self._app.topLevelWidgets():
+            objects.extend(widget.findChildren(object_type))
+        return objects
+
+    @staticmethod
+    def _is_short_timer(timer):
+        return timer.isActive() and timer.isSingleShot() and timer.interval() <= SHORT_TIMER_INTERVAL
 
 
 def nothing():
@@ -166,23 +314,25 @@ class ValueMatcherProbe(Probe):
 class MultiValueMatcherProbe(Probe):
     """
     A probe for callables that expect multiple arguments. Use with collection matchers.
+    Given a capacity, only the latest values received are kept.
     """
 
-    def __init__(self, message, matcher=empty()):
+    def __init__(self, message, matcher=empty(), capacity=None):
         super().__init__()
         self._message = message
+        self._capacity = capacity
         self.expect(matcher)
 
     def expect(self, matcher):
         self._value_matcher = matcher
         self._has_received_a_value = False
-        self._received_values = []
+        self._received_values = [] if self._capacity is None else deque(maxlen=self._capacity)
 
     def test(self):
         pass
 
     def is_satisfied(self):
-        return self._has_received_a_value and self._value_matcher.matches(self._received_values)
+        return self._has_received_a_value and self._value_matcher.matches(list(self._received_values))
 
     def describe_to(self, description):
         description.append_text(self._message).append_text(" with ") \
@@ -231,3 +381,107 @@ class KeywordsValueMatcherProbe(Probe):
     def received(self, *_, **values):
         self._has_received_a_value = True
         self._received_values = dict(values)
+
+
+DEFAULT_SIGNAL_CAPACITY = 100
+
+Emission = namedtuple("Emission", "value timestamp")
+
+
+def emission_count(signal, matcher, capacity=DEFAULT_SIGNAL_CAPACITY):
+    return SignalProbe(signal, "count", lambda probe: probe.count, matcher, capacity)
+
+
+def last_emitted_value(signal, matcher, capacity=DEFAULT_SIGNAL_CAPACITY):
+    return SignalProbe(signal, "last value", lambda probe: probe.last_value, matcher, capacity, requires_emission=True)
+
+
+def emitted_values(signal, matcher, capacity=DEFAULT_SIGNAL_CAPACITY):
+    return SignalProbe(signal, "values", lambda probe: probe.values, matcher, capacity)
+
+
+class SignalProbe(Probe):
+    """
+    Spies on a bound signal, keeping its latest emissions - along with the monotonic time they were received at -
+    in a ring buffer of fixed capacity. The probe matches either the number of emissions, the last value emitted
+    or the sequence of values still in the buffer.
+
+    The probe disconnects from the signal once its check ends - satisfied or not - or, when used as a context manager,
+    once the block exits.
+    """
+
+    def __init__(self, signal, aspect, select, matcher, capacity=DEFAULT_SIGNAL_CAPACITY, requires_emission=False):
+        super(SignalProbe, self).__init__()
+        self._signal = signal
+        self._name = signal.signal.lstrip("0123456789")
+        self._aspect = aspect
+        self._select = select
+        self._matcher = wrap_matcher(matcher)
+        self._requires_emission = requires_emission
+        self._emissions = deque(maxlen=capacity)
+        self._satisfied = False
+        self.count = 0
+        self._signal.connect(self._received)
+        self._connected = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.disconnect()
+
+    @property
+    def emissions(self):
+        return tuple(self._emissions)
+
+    @property
+    def values(self):
+        return [emission.value for emission in self._emissions]
+
+    @property
+    def last_value(self):
+        return self._emissions[-1].value if self._emissions else None
+
+    def disconnect(self):
+        if self._connected:
+            self._connected = False
+            try:
+                self._signal.disconnect(self._received)
+            except (TypeError, RuntimeError):
+                # The sender is already gone
+                pass
+
+    def test(self):
+        if not self._satisfied:
+            self._satisfied = self._has_been_emitted_if_needed() and self._matcher.matches(self._select(self))
+        if self._satisfied:
+            self.disconnect()
+
+    def release(self):
+        self.disconnect()
+
+    def is_satisfied(self):
+        return self._satisfied
+
+    def describe_to(self, description):
+        description.append_text("signal {0} with {1} ".format(self._name, self._aspect)) \
+            .append_description_of(self._matcher)
+
+    def describe_failure_to(self, description):
+        description.append_text("signal {0} ".format(self._name))
+        if not self._has_been_emitted_if_needed():
+            description.append_text("was not emitted")
+            return
+
+        description.append_text("{0} ".format(self._aspect))
+        self._matcher.describe_mismatch(self._select(self), description)
+
+    def _has_been_emitted_if_needed(self):
+        # Tells a signal that was never emitted from one that emitted None
+        return not self._requires_emission or self.count > 0
+
+    def _received(self, *values):
+        self.count += 1
+        value = values[0] if len(values) == 1 else (values or None)
+        self._emissions.append(Emission(value, time.monotonic()))
+        event_loop.wake_watchers()
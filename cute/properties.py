@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
+from contextlib import contextmanager
+
 from PyQt5.QtCore import Qt, QObject, QSize
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtWidgets import QLabel, QLineEdit, QDateTimeEdit, QComboBox, QAbstractButton, QAction
 from hamcrest.core.selfdescribing import SelfDescribing
 
+from . import event_loop
+
+# How costly queries are to evaluate, so that cheap checks run first
+CHEAP, MODERATE, EXPENSIVE = 0, 1, 2
+
 
 def name():
-    return PropertyQuery("name", QObject.objectName)
+    return PropertyQuery("name", QObject.objectName, cost=CHEAP)
 
 
 def text():
-    return PropertyQuery("text", lambda w: w.text())
+    return PropertyQuery("text", _text)
 
 
 def data():
@@ -30,7 +37,7 @@ def size_width():
 
 
 def label_pixmap():
-    return PropertyQuery("pixmap", QLabel.pixmap)
+    return PropertyQuery("pixmap", QLabel.pixmap, cost=EXPENSIVE)
 
 
 def pixmap_size():
@@ -46,7 +53,7 @@ def input_text():
 
 
 def plain_text():
-    return PropertyQuery("plain text", lambda w: w.toPlainText())
+    return PropertyQuery("plain text", _plain_text)
 
 
 def current_text():
@@ -54,7 +61,7 @@ def current_text():
 
 
 def item_text():
-    return PropertyQuery("item text", lambda item: item.data(Qt.DisplayRole))
+    return PropertyQuery("item text", _item_text)
 
 
 def time():
@@ -66,31 +73,76 @@ def date():
 
 
 def title():
-    return PropertyQuery("title", lambda w: w.title())
+    return PropertyQuery("title", _title)
 
 
 def window_title():
-    return PropertyQuery("window title", lambda w: w.windowTitle())
+    return PropertyQuery("window title", _window_title)
 
 
 def cursor_shape():
-    return PropertyQuery("cursor shape", lambda w: w.cursor().shape())
+    return PropertyQuery("cursor shape", _cursor_shape)
 
 
 def count():
-    return PropertyQuery("options count", lambda w: w.count())
+    return PropertyQuery("options count", _count)
 
 
 def tooltip():
-    return PropertyQuery("tooltip", lambda w: w.toolTip())
+    return PropertyQuery("tooltip", _tooltip)
 
 
 def has_option_text(index):
     return PropertyQuery("option {0}".format(index), lambda combo_box: combo_box.itemText(index))
 
 
+def meta_property(name):
+    """
+    Queries any Qt property - including those of custom widgets - by name. Properties are read every time, and
+    those that have a NOTIFY signal also wake up probers waiting for a change as soon as the signal is emitted.
+    """
+    return MetaPropertyQuery(name)
+
+
 def current_directory():
-    return PropertyQuery("current directory", lambda dialog: dialog.directory().absolutePath())
+    return PropertyQuery("current directory", _current_directory)
+
+
+# Readers are named functions rather than lambdas, so that queries created separately share their snapshot values
+def _text(widget):
+    return widget.text()
+
+
+def _plain_text(widget):
+    return widget.toPlainText()
+
+
+def _item_text(item):
+    return item.data(Qt.DisplayRole)
+
+
+def _title(widget):
+    return widget.title()
+
+
+def _window_title(widget):
+    return widget.windowTitle()
+
+
+def _cursor_shape(widget):
+    return widget.cursor().shape()
+
+
+def _count(widget):
+    return widget.count()
+
+
+def _tooltip(widget):
+    return widget.toolTip()
+
+
+def _current_directory(dialog):
+    return dialog.directory().absolutePath()
 
 
 class Query(SelfDescribing):
@@ -99,13 +151,89 @@ class Query(SelfDescribing):
 
 
 class PropertyQuery(Query):
-    def __init__(self, name, query):
+    def __init__(self, name, query, cost=MODERATE):
         super().__init__()
         self._property_name = name
         self._query = query
+        self.cost = cost
+
+    @property
+    def name(self):
+        return self._property_name
 
     def __call__(self, arg):
+        if _snapshot is not None:
+            return _snapshot.value_of(arg, self)
+        return self._query(arg)
+
+    @property
+    def key(self):
+        """Identifies what the query reads, queries with the same key reading the same value"""
+        return self._query
+
+    def read(self, arg):
+        """Reads the property right away, bypassing any snapshot"""
         return self._query(arg)
 
     def describe_to(self, description):
         description.append_text(self._property_name)
+
+
+class MetaPropertyQuery(PropertyQuery):
+    def __init__(self, name):
+        super().__init__(name, self._read)
+
+    @property
+    def key(self):
+        return MetaPropertyQuery, self.name
+
+    def _read(self, obj):
+        meta_object = obj.metaObject()
+        meta_property = meta_object.property(meta_object.indexOfProperty(self.name))
+        if not meta_property.isValid():
+            return obj.property(self.name)
+
+        # Changes made with signals blocked are never notified, so notifications only ever wake probers up
+        if meta_property.hasNotifySignal():
+            signal_name = bytes(meta_property.notifySignal().name()).decode()
+            if hasattr(obj, signal_name):
+                event_loop.wake_watchers_on(obj, signal_name)
+        return meta_property.read(obj)
+
+
+class PropertySnapshot:
+    """
+    The values of the properties read within a scope, keyed by object and query key.
+    Within the scope, each property of an object is read only once, however many queries and matchers ask for it.
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def value_of(self, arg, query):
+        # Holding on to the object guarantees its id is not reused within the scope
+        key = (id(arg), query.key)
+        if key not in self._values:
+            self._values[key] = (arg, query.read(arg))
+        return self._values[key][1]
+
+    def read(self, arg, *queries):
+        return [self.value_of(arg, query) for query in queries]
+
+
+_snapshot = None
+
+
+@contextmanager
+def snapshot():
+    """Shares a snapshot of the properties read within the scope - or within the outermost scope, if nested"""
+    global _snapshot
+    if _snapshot is not None:
+        yield _snapshot
+        return
+
+    _snapshot = PropertySnapshot()
+    try:
+        yield _snapshot
+    finally:
+        _snapshot = None
@@ -1,12 +1,10 @@
 # -*- coding: utf-8 -*-
-import time
-
 from PyQt5.QtCore import Qt, QPoint
 from PyQt5.QtGui import QCursor
 from PyQt5.QtTest import QTest
 from PyQt5.QtWidgets import QApplication
 
-from . import event_loop
+from .event_loop import RealClock
 from .gestures import Automaton, MIN_TIME_TO_AVOID_DOUBLE_CLICK
 
 ONE_SECOND_IN_MILLIS = 1000
@@ -49,10 +47,6 @@ class MouseLayout:
         return MouseLayout.BUTTON_MAP.get(button, button)
 
 
-def current_time():
-    return time.perf_counter()
-
-
 class Robot(Automaton):
     """
     A robotic automaton that simulates human gestures. It is very fast, but has limitations.
@@ -68,8 +62,9 @@ class Robot(Automaton):
     _last_click_time = 0
     _last_click_position = (-1, -1)
 
-    def __init__(self):
+    def __init__(self, clock=None):
         self._modifiers = Qt.NoModifier
+        self._clock = clock or RealClock()
 
     @property
     def mouse_position(self):
@@ -100,13 +95,13 @@ class Robot(Automaton):
         self._at_cursor_position(mouse_action, MouseLayout.button_code(button))
 
         # for detecting double clicks
-        self._last_click_time = current_time()
+        self._last_click_time = self._clock.time()
         self._last_button_clicked = button
         self._last_click_position = self.mouse_position
 
     def _double_click_detected(self, button_clicked):
         current_position = self.mouse_position
-        elapsed_time_in_ms = (current_time() - self._last_click_time) * ONE_SECOND_IN_MILLIS
+        elapsed_time_in_ms = (self._clock.time() - self._last_click_time) * ONE_SECOND_IN_MILLIS
 
         return (button_clicked == self._last_button_clicked) and \
                (current_position == self._last_click_position) and \
@@ -119,7 +114,7 @@ class Robot(Automaton):
         self._at_cursor_position(QTest.mouseDClick, MouseLayout.button_code(button))
 
     def delay(self, ms):
-        event_loop.process_events_for(ms)
+        return self._clock.wait(ms)
 
     def _at_cursor_position(self, mouse_action, button):
         # By default QTest will operate mouse at the center of the widget,
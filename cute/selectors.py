@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+A compact, CSS-like language for selecting widgets, e.g. 'QDialog#export QComboBox[currentText="CSV"]'.
+
+A query is a sequence of steps separated by a descendant (whitespace) or a child ('>') combinator. Each step
+names a class, or '*' for any class, followed by any number of:
+
+  - #name, to match the object name
+  - [property], [property=value], [property^=value], [property$=value] or [property*=value],
+    to match the text of a Qt property, with values optionally quoted
+  - :visible, :hidden, :enabled, :disabled, :checked, :unchecked or :focused, to match the widget state
+
+Classes are matched by name against the Qt meta-object hierarchy, so custom widget classes can be selected too.
+"""
+import re
+
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import QObject
+
+DESCENDANT, CHILD = " ", " > "
+
+_TOKENS = re.compile(r"""
+    (?P<child>\s*>\s*)
+  | (?P<descendant>\s+)
+  | (?P<type>[A-Za-z_]\w*|\*)
+  | \#(?P<name>[\w-]+)
+  | \[\s*(?P<property>[A-Za-z_]\w*)\s*
+      (?:(?P<operator>[*^$]?=)\s*(?:"(?P<double_quoted>[^"]*)"|'(?P<single_quoted>[^']*)'|(?P<bare>[^\]\s]+))\s*)?
+    \]
+  | :(?P<state>[a-z]+)
+""", re.VERBOSE)
+
+_OPERATORS = {
+    "=": lambda text, value: text == value,
+    "^=": lambda text, value: text.startswith(value),
+    "$=": lambda text, value: text.endswith(value),
+    "*=": lambda text, value: value in text,
+}
+
+_STATES = {
+    "visible": lambda widget: widget.isVisible(),
+    "hidden": lambda widget: not widget.isVisible(),
+    "enabled": lambda widget: widget.isEnabled(),
+    "disabled": lambda widget: not widget.isEnabled(),
+    "checked": lambda widget: bool(widget.property("checked")),
+    "unchecked": lambda widget: not widget.property("checked"),
+    "focused": lambda widget: widget.hasFocus(),
+}
+
+
+def compile_query(query):
+    """Compiles a query into a plan that can be run against the widget trees as many times as needed"""
+    steps, step, combinator = [], None, DESCENDANT
+    position, query = 0, query.strip()
+    while position < len(query):
+        token = _TOKENS.match(query, position)
+        if token is None:
+            raise ValueError("Invalid selector '{0}' at position {1}".format(query, position))
+        position = token.end()
+
+        if token.group("child") is not None or token.group("descendant") is not None:
+            if step is None:
+                raise ValueError("Invalid selector '{0}' at position {1}".format(query, token.start()))
+            combinator, step = CHILD if token.group("child") is not None else DESCENDANT, None
+            continue
+
+        if step is None:
+            step = _Step(combinator)
+            steps.append(step)
+        elif token.group("type") is not None:
+            raise ValueError("Invalid selector '{0}' at position {1}".format(query, token.start()))
+        _add_token_to(step, token)
+
+    if step is None:
+        raise ValueError("Invalid selector '{0}'".format(query))
+    return QueryPlan(query, steps)
+
+
+def _add_token_to(step, token):
+    if token.group("type") is not None:
+        step.type_name = token.group("type")
+    elif token.group("name") is not None:
+        step.name = token.group("name")
+    elif token.group("property") is not None:
+        value = next((value for value in token.group("double_quoted", "single_quoted", "bare") if value is not None),
+                     None)
+        step.properties.append((token.group("property"), token.group("operator"), value))
+    elif token.group("state") in _STATES:
+        step.states.append(_STATES[token.group("state")])
+    else:
+        raise ValueError("Unknown state ':{0}'".format(token.group("state")))
+
+
+class _Step:
+    def __init__(self, combinator):
+        self.combinator = combinator
+        self.type_name = "*"
+        self.name = None
+        self.properties = []
+        self.states = []
+
+    @property
+    def widget_type(self):
+        widget_type = getattr(QtWidgets, self.type_name, None)
+        return widget_type if isinstance(widget_type, type) and issubclass(widget_type, QObject) else QObject
+
+    def matches(self, widget):
+        if self.type_name != "*" and not widget.inherits(self.type_name):
+            return False
+        if self.name is not None and widget.objectName() != self.name:
+            return False
+        if self.states and not widget.isWidgetType():
+            return False
+        return all(self._has_property(widget, *each) for each in self.properties) and \
+               all(state(widget) for state in self.states)
+
+    @staticmethod
+    def _has_property(widget, name, operator, value):
+        actual = widget.property(name)
+        if operator is None:
+            return actual is not None
+        return actual is not None and _OPERATORS[operator](_text_of(actual), value)
+
+
+def _text_of(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class QueryPlan:
+    """
+    A compiled query. Candidates are looked up by the class and name of the last step, in a single pass,
+    then the remaining steps are matched bottom-up against their ancestors.
+    """
+
+    def __init__(self, query, steps):
+        self.query = query
+        self._steps = steps
+
+    @property
+    def candidate_type(self):
+        return self._steps[-1].widget_type
+
+    @property
+    def candidate_name(self):
+        return self._steps[-1].name
+
+    def matches(self, widget, root):
+        """Tells whether the widget is selected, looking no further up its ancestors than the given root"""
+        return self._matches_from(len(self._steps) - 1, widget, root)
+
+    def _matches_from(self, position, widget, root):
+        step = self._steps[position]
+        if not step.matches(widget):
+            return False
+        if position == 0:
+            return True
+
+        ancestor = widget
+        while ancestor is not root:
+            ancestor = ancestor.parent()
+            if ancestor is None:
+                return False
+            if self._matches_from(position - 1, ancestor, root):
+                return True
+            if step.combinator == CHILD:
+                return False
+        return False
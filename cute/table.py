@@ -1,19 +1,25 @@
 from PyQt5.QtCore import Qt, QRect, QPoint
-from hamcrest.core.base_matcher import BaseMatcher
 
+from .matchers import EvaluatingMatcher
 
-class TableMatcher(BaseMatcher):
+
+class TableMatcher(EvaluatingMatcher):
     def __init__(self, wrapped_matcher):
+        super().__init__()
         self._matcher = wrapped_matcher
 
+    def evaluate(self, widget):
+        return Table(widget)
+
     def _matches(self, widget):
-        return self._matcher.matches(Table(widget))
+        return self._matcher.matches(self.value_of(widget))
 
     def describe_to(self, description):
         self._matcher.describe_to(description)
 
     def describe_mismatch(self, widget, mismatch_description):
-        self._matcher.describe_mismatch(Table(widget), mismatch_description)
+        # Matchers of the table then describe what they last evaluated on that same table
+        self._matcher.describe_mismatch(self.last_value_of(widget), mismatch_description)
 
 
 class TableManipulation:
@@ -5,12 +5,15 @@ from PyQt5.QtWidgets import QApplication, QMainWindow, QLineEdit, QPushButton, Q
     QMenu, QComboBox, QTextEdit, QLabel, QAbstractButton, QSpinBox, QTableView, QDialogButtonBox
 from hamcrest import all_of, anything, contains, described_as
 from hamcrest.core.base_matcher import BaseMatcher
+from hamcrest.core.string_description import StringDescription
 
 from cute import event_loop, keys
-from . import gestures, properties, matchers as match, rect
+from . import gestures, properties, matchers as match, rect, selectors, index as widget_index
+from .prober import run_test_once, first_of
 from .finders import SingleWidgetFinder, TopLevelWidgetsFinder, RecursiveWidgetFinder, NthWidgetFinder, \
-    WidgetSelector, WidgetIdentity, MissingWidgetFinder
-from .probes import WidgetManipulatorProbe, WidgetAssertionProbe, WidgetPropertyAssertionProbe, WidgetScreenBoundsProbe
+    WidgetSelector, WidgetIdentity, MissingWidgetFinder, QueryPlanFinder, PinnedSelector, ObjectPathFinder
+from .probes import WidgetManipulatorProbe, WidgetAssertionProbe, WidgetPropertyAssertionProbe, \
+    WidgetScreenBoundsProbe, ApplicationIdleProbe, WidgetGestureProbe, screen_center_of, within_screen_bounds
 from .table import TableMatcher, TableManipulation, Table
 
 
@@ -19,15 +22,23 @@ def any_widget():
 
 
 def all_top_level_widgets():
-    return TopLevelWidgetsFinder(QApplication.instance())
+    return TopLevelWidgetsFinder(QApplication.instance(), widget_index.installed())
 
 
-def all_widgets(of_type, matching=any_widget()):
-    return RecursiveWidgetFinder(of_type, matching, all_top_level_widgets())
+def all_widgets(of_type, matching=any_widget(), traversal=None):
+    return RecursiveWidgetFinder(of_type, matching, all_top_level_widgets(), traversal)
 
 
-def only_widget(of_type, matching=any_widget()):
-    return SingleWidgetFinder(all_widgets(of_type, matching))
+def only_widget(of_type, matching=any_widget(), traversal=None):
+    return SingleWidgetFinder(all_widgets(of_type, matching, traversal))
+
+
+def all_selected(query):
+    return QueryPlanFinder(selectors.compile_query(query), all_top_level_widgets())
+
+
+def only_selected(query):
+    return SingleWidgetFinder(all_selected(query))
 
 
 def no_widget(of_type, matching=any_widget()):
@@ -83,6 +94,16 @@ class QWidgetDriver:
             RecursiveWidgetFinder(widget_type, all_of(*matchers), parent.selector), index),
             parent.prober, parent.gesture_performer)
 
+    @classmethod
+    def find_by_path(cls, parent, widget_type, *path):
+        return cls(SingleWidgetFinder(ObjectPathFinder(widget_type, path, parent.selector)), parent.prober,
+                   parent.gesture_performer)
+
+    @classmethod
+    def find_selected(cls, parent, query):
+        return cls(SingleWidgetFinder(QueryPlanFinder(selectors.compile_query(query), parent.selector)),
+                   parent.prober, parent.gesture_performer)
+
     def exists(self):
         self.check(self.selector)
 
@@ -101,6 +122,10 @@ class QWidgetDriver:
     def is_(self, criteria):
         self.check(WidgetAssertionProbe(self.selector, criteria))
 
+    def _is_now(self, criteria):
+        # Checks that gate a gesture or produce a value are never deferred to the end of a batch
+        self.prober.check_now(WidgetAssertionProbe(self.selector, criteria))
+
     def has(self, query, criteria):
         self.check(WidgetPropertyAssertionProbe(self.selector, query, criteria))
 
@@ -114,7 +139,7 @@ class QWidgetDriver:
         self.has(properties.window_title(), title)
 
     def manipulate(self, description, manipulation):
-        self.check(WidgetManipulatorProbe(self.selector, manipulation, description))
+        self.prober.check_now(WidgetManipulatorProbe(self.selector, manipulation, description))
         self.refresh()
 
     def refresh(self):
@@ -126,6 +151,11 @@ class QWidgetDriver:
         self.manipulate("retrieve its {0}".format(description), manipulation)
         return manipulation.value
 
+    def query_many(self, *queries):
+        """Returns the values of several property queries, all read from the same widget in a single pass"""
+        description = ", ".join(str(StringDescription().append_description_of(query)) for query in queries)
+        return self.query(description, lambda widget: properties.PropertySnapshot().read(widget, *queries))
+
     def widget(self):
         return self.query("widget", lambda widget: widget)
 
@@ -134,31 +164,74 @@ class QWidgetDriver:
 
     def widget_bounds(self):
         probe = WidgetScreenBoundsProbe(self.selector)
-        self.check(probe)
+        self.prober.check_now(probe)
         return probe.bounds
 
     def click(self):
         return self.left_click_on_widget()
 
-    def left_click_on_widget(self):
-        self.is_showing_on_screen()
-        self.perform(gestures.mouse_click_at(self.widget_center()))
+    def left_click_on_widget(self, *preconditions):
+        self.perform_on_widget("click on it", gestures.mouse_click_at, *preconditions)
+
+    def perform_on_widget(self, description, gesture, *preconditions, locate=screen_center_of):
+        """
+        Performs the gesture at the point located on the widget - its center by default - as soon as the widget
+        is showing on screen and meets the other preconditions, resolving the widget only once.
+        """
+        self.prober.check_now(WidgetGestureProbe(self.selector, all_of(match.showing_on_screen(), *preconditions),
+                                                 locate, gesture, self.gesture_performer, description))
 
     def enter(self):
         self.perform(gestures.enter())
 
     def perform(self, *gestures_to_perform):
-        self.gesture_performer.perform(*gestures_to_perform)
+        with self.prober.spending("perform gestures"):
+            self.gesture_performer.perform(*gestures_to_perform)
 
     def check(self, probe):
         self.prober.check(probe)
 
+    def check_all(self, *probes):
+        self.prober.check_all(*probes)
+
+    def check_first_of(self, *probes):
+        """Waits for the first of several outcomes and returns the probe that was satisfied"""
+        outcome = first_of(*probes)
+        self.prober.check_now(outcome)
+        return outcome.satisfied_probe
+
+    def batch(self):
+        """
+        Checks assertions made within the batch - by this driver or any other sharing its prober - all together
+        once the batch ends. Manipulations, queries and gestures - along with the checks they depend on - are still
+        carried out right away.
+        """
+        return self.prober.batch()
+
+    def budget(self, duration_in_ms):
+        return self.prober.budget(duration_in_ms)
+
     def close(self):
         self.manipulate("close the widget", lambda widget: widget.close())
 
     def pause(self, ms):
         self.perform(gestures.pause(ms))
 
+    def pin(self):
+        """
+        Holds on to the widget once found, rather than searching for it on every operation,
+        until the widget is destroyed, reparented or no longer meets the criteria of the selector.
+        """
+        if not isinstance(self.selector, PinnedSelector):
+            self.selector = PinnedSelector(self.selector)
+
+    def unpin(self):
+        if isinstance(self.selector, PinnedSelector):
+            self.selector = self.selector.selector
+
+    def wait_until_idle(self):
+        self.prober.check_now(ApplicationIdleProbe(QApplication.instance()))
+
 
 class AbstractEditDriver(QWidgetDriver):
     def change_text(self, text):
@@ -166,8 +239,7 @@ class AbstractEditDriver(QWidgetDriver):
         self.enter()
 
     def replace_all_text(self, text):
-        self.is_enabled()
-        self.focus_with_mouse()
+        self.left_click_on_widget(match.enabled())
         self.clear_all_text()
         self.type_text(text)
 
@@ -190,8 +262,7 @@ class AbstractEditDriver(QWidgetDriver):
 
 class QButtonDriver(QWidgetDriver):
     def click(self):
-        self.is_enabled()
-        super().click()
+        self.left_click_on_widget(match.enabled())
 
     def has_text(self, matcher):
         self.has(properties.text(), matcher)
@@ -288,8 +359,13 @@ class QComboBoxDriver(AbstractEditDriver):
         self.open_options().has_no_item(match.with_item_text(matching))
         self.dismiss_options()
 
+    @staticmethod
+    def _drop_down_button_within(bounds):
+        return rect.center_right(rect.inside_bounds(bounds, right=5))
+
     def open_options(self):
-        self.perform(gestures.mouse_click_at(rect.center_right(rect.inside_bounds(self.widget_bounds(), right=5))))
+        self.perform_on_widget("open its options", gestures.mouse_click_at,
+                               locate=within_screen_bounds(self._drop_down_button_within))
         return QListViewDriver.find_single(self, QListView)
 
     def dismiss_options(self):
@@ -306,8 +382,13 @@ class QDateTimeEditDriver(QWidgetDriver):
     def has_time(self, time):
         self.has(properties.time(), QTime.fromString(time, self.display_format()))
 
+    @staticmethod
+    def _first_section_within(bounds):
+        return rect.center_left(rect.inside_bounds(bounds, left=5))
+
     def enter_date(self, year, month, day):
-        self.perform(gestures.mouse_double_click_at(rect.center_left(rect.inside_bounds(self.widget_bounds(), left=5))))
+        self.perform_on_widget("select its first section", gestures.mouse_double_click_at,
+                               locate=within_screen_bounds(self._first_section_within))
         self.perform(gestures.type_text(str(year) + "{0:02d}".format(month) + "{0:02d}".format(day)))
         self.perform(gestures.enter())
 
@@ -317,7 +398,8 @@ class QDateTimeEditDriver(QWidgetDriver):
         self._calendar().select_date(year, month, day)
 
     def _popup_calendar(self):
-        self.perform(gestures.mouse_click_at(rect.center_right(self.widget_bounds())))
+        self.perform_on_widget("pop up its calendar", gestures.mouse_click_at,
+                               locate=within_screen_bounds(rect.center_right))
 
     def _calendar(self):
         calendar = self.query("calendar widget", lambda date_edit: date_edit.calendarWidget())
@@ -345,7 +427,7 @@ class QDialogDriver(QWidgetDriver):
         self.button_box().click_no()
 
     def button_box(self):
-        self.is_showing_on_screen()
+        self._is_now(match.showing_on_screen())
         return QDialogButtonBoxDriver.find_single(self, QDialogButtonBox)
 
 
@@ -366,7 +448,7 @@ class QDialogButtonBoxDriver(QWidgetDriver):
         return self.button(QDialogButtonBox.Ok)
 
     def button(self, role):
-        self.is_showing_on_screen()
+        self._is_now(match.showing_on_screen())
         button = self.query("button with role {0}".format(role), lambda button_box: button_box.button(role))
         # todo find a way to fail with a descriptive message if button is None
         return QButtonDriver(WidgetIdentity(button), self.prober, self.gesture_performer)
@@ -527,13 +609,15 @@ class QListViewDriver(QWidgetDriver):
 
     def _select_item_at(self, index, from_dialog):
         self._scroll_item_to_visible(index)
-        self.perform(gestures.mouse_click_at(self._center_of_item(index)))
+        self.perform_on_widget("click on item #{0}".format(index), gestures.mouse_click_at,
+                               locate=self._center_of_item(index))
         if from_dialog:
             self.perform(gestures.type_key(keys.SPACE))
 
     def _open_item_at(self, index):
         self._scroll_item_to_visible(index)
-        self.perform(gestures.mouse_double_click_at(self._center_of_item(index)))
+        self.perform_on_widget("double click on item #{0}".format(index), gestures.mouse_double_click_at,
+                               locate=self._center_of_item(index))
 
     def _select_items_at(self, indexes, from_dialog):
         self._select_item_at(indexes.pop(0), from_dialog)
@@ -542,22 +626,21 @@ class QListViewDriver(QWidgetDriver):
 
     def _multi_select_item_at(self, index, from_dialog):
         self._scroll_item_to_visible(index)
-        self.perform(gestures.mouse_multi_click_at(self._center_of_item(index)))
+        self.perform_on_widget("add item #{0} to the selection".format(index), gestures.mouse_multi_click_at,
+                               locate=self._center_of_item(index))
         if from_dialog:
             self.perform(gestures.type_key(keys.SPACE))
 
     def _scroll_item_to_visible(self, index):
         self.manipulate("scroll item #{0} to visible".format(index), lambda list_view: list_view.scrollTo(index))
 
-    def _center_of_item(self, index):
-        class CalculateCenterOfItem:
-            def __call__(self, list_view):
-                item_visible_area = list_view.visualRect(index)
-                self.pos = list_view.mapToGlobal(item_visible_area.center())
+    @staticmethod
+    def _center_of_item(index):
+        def locate_item(list_view):
+            item_visible_area = list_view.visualRect(index)
+            return list_view.mapToGlobal(item_visible_area.center()) if not item_visible_area.isEmpty() else None
 
-        calculate_center = CalculateCenterOfItem()
-        self.manipulate("calculate center of item #{0}".format(index), calculate_center)
-        return calculate_center.pos
+        return locate_item
 
     def _index_of_first_item(self, matching):
         class ContainingMatchingItem(BaseMatcher):
@@ -582,7 +665,7 @@ class QListViewDriver(QWidgetDriver):
                 matching.describe_to(mismatch_description)
 
         containing_item = ContainingMatchingItem()
-        self.is_(containing_item)
+        self._is_now(containing_item)
         return containing_item.at_index
 
     def _is_not_containing(self, matching):
@@ -622,7 +705,7 @@ class QMenuDriver(QWidgetDriver):
         return QMenuItemDriver(WidgetIdentity(action), self.prober, self.gesture_performer)
 
     def select_menu_item(self, matching):
-        self.is_showing_on_screen()
+        self._is_now(match.showing_on_screen())
         menu_item = self.menu_item(matching)
         menu_item.click()
 
@@ -661,16 +744,16 @@ class QMenuDriver(QWidgetDriver):
                 mismatch_description.append_text("positioned at index {0}".format(self._index))
 
         containing_menu_item = ContainingMatchingMenuItem()
-        self.is_(containing_menu_item)
+        self._is_now(containing_menu_item)
         if track_index is not None:
-            self.is_(MenuItemPositionedAt())
+            self._is_now(MenuItemPositionedAt())
         return containing_menu_item.action
 
 
 class QMenuBarDriver(QWidgetDriver):
     def menu(self, matching):
         # First we have to make sure the menu actually exists on the menu bar
-        self.has_menu(matching)
+        self._is_now(self._containing_menu(matching))
 
         # QMenuBar on Mac OS X is a wrapper for using the system-wide menu bar
         # so we cannot just click on it, we have to pop it up manually
@@ -678,6 +761,10 @@ class QMenuBarDriver(QWidgetDriver):
         return menu_driver
 
     def has_menu(self, matching):
+        self.is_(self._containing_menu(matching))
+
+    @staticmethod
+    def _containing_menu(matching):
         class ContainingMatchingMenu(BaseMatcher):
             def _matches(self, menu_bar):
                 for menu in [action.menu() for action in menu_bar.actions()]:
@@ -693,25 +780,18 @@ class QMenuBarDriver(QWidgetDriver):
                 mismatch_description.append_text("contained no menu ")
                 matching.describe_to(mismatch_description)
 
-        self.is_(ContainingMatchingMenu())
+        return ContainingMatchingMenu()
 
 
 class QMenuItemDriver(QWidgetDriver):
-    def _center_of_item(self):
-        class CalculateCenterOfItem:
-            def __call__(self, item):
-                menu = item.associatedWidgets()[0]
-                item_visible_area = menu.actionGeometry(item)
-                self.coordinates = menu.mapToGlobal(item_visible_area.center())
-
-        calculate_center = CalculateCenterOfItem()
-        self.manipulate('calculate center of item', calculate_center)
-        return calculate_center.coordinates
+    @staticmethod
+    def _center_of_item(item):
+        menu = item.associatedWidgets()[0]
+        item_visible_area = menu.actionGeometry(item)
+        return menu.mapToGlobal(item_visible_area.center())
 
     def click(self):
-        self.is_enabled()
-        self.is_showing_on_screen()
-        self.perform(gestures.mouse_click_at(self._center_of_item()))
+        self.perform_on_widget("click on it", gestures.mouse_click_at, match.enabled(), locate=self._center_of_item)
 
 
 class QMessageBoxDriver(QDialogDriver):
@@ -759,9 +839,12 @@ class QTableViewDriver(QWidgetDriver):
         self.is_(TableMatcher(criteria))
 
     def has_headers(self, matching):
-        class WithMatchingHeaders(BaseMatcher):
+        class WithMatchingHeaders(match.EvaluatingMatcher):
+            def evaluate(self, table):
+                return table.headers()
+
             def _matches(self, table):
-                return matching.matches(table.headers())
+                return matching.matches(self.value_of(table))
 
             def describe_to(self, description):
                 description.append_text("has headers ")
@@ -769,7 +852,7 @@ class QTableViewDriver(QWidgetDriver):
 
             def describe_mismatch(self, table, mismatch_description):
                 mismatch_description.append_text("headers ")
-                matching.describe_mismatch(table.headers(), mismatch_description)
+                matching.describe_mismatch(self.last_value_of(table), mismatch_description)
 
         self.is_table(WithMatchingHeaders())
 
@@ -791,13 +874,16 @@ class QTableViewDriver(QWidgetDriver):
                 matching.describe_to(mismatch_description)
 
         with_matching_row = WithMatchingRow()
-        self.is_table(with_matching_row)
+        self._is_now(TableMatcher(with_matching_row))
         return with_matching_row.index
 
     def contains_rows(self, matching):
-        class WithMatchingRows(BaseMatcher):
+        class WithMatchingRows(match.EvaluatingMatcher):
+            def evaluate(self, table):
+                return table.all_cells()
+
             def _matches(self, table):
-                return matching.matches(table.all_cells())
+                return matching.matches(self.value_of(table))
 
             def describe_to(self, description):
                 description.append_text("contains rows ")
@@ -805,14 +891,17 @@ class QTableViewDriver(QWidgetDriver):
 
             def describe_mismatch(self, table, mismatch_description):
                 mismatch_description.append_text("rows ")
-                matching.describe_mismatch(table.all_cells(), mismatch_description)
+                matching.describe_mismatch(self.last_value_of(table), mismatch_description)
 
         self.is_table(WithMatchingRows())
 
     def has_value_in_cell(self, matching, row, column):
-        class WithMatchingCell(BaseMatcher):
+        class WithMatchingCell(match.EvaluatingMatcher):
+            def evaluate(self, table):
+                return table.cell_text(row, column)
+
             def _matches(self, table):
-                return matching.matches(table.cell_text(row, column))
+                return matching.matches(self.value_of(table))
 
             def describe_to(self, description):
                 description.append_text("displays ")
@@ -821,7 +910,7 @@ class QTableViewDriver(QWidgetDriver):
 
             def describe_mismatch(self, table, mismatch_description):
                 mismatch_description.append_text("value of cell at {} x {} ".format(row, column))
-                matching.describe_mismatch(table.cell_text(row, column), mismatch_description)
+                matching.describe_mismatch(self.last_value_of(table), mismatch_description)
 
         self.is_table(WithMatchingCell())
 
@@ -874,8 +963,11 @@ class QTableViewDriver(QWidgetDriver):
             def is_satisfied(self):
                 return self._widget_in_cell is not None
 
+            def is_impossible(self):
+                return self._table_selector.is_impossible()
+
             def test(self):
-                self._table_selector.test()
+                run_test_once(self._table_selector)
 
                 if not self._table_selector.is_satisfied():
                     self._widget_in_cell = None
@@ -887,9 +979,12 @@ class QTableViewDriver(QWidgetDriver):
         return QWidgetDriver(WidgetInCell(self.selector), self.prober, self.gesture_performer)
 
     def has_row_count(self, matching):
-        class WithMatchingRowCount(BaseMatcher):
+        class WithMatchingRowCount(match.EvaluatingMatcher):
+            def evaluate(self, table):
+                return table.row_count()
+
             def _matches(self, table):
-                return matching.matches(table.row_count())
+                return matching.matches(self.value_of(table))
 
             def describe_to(self, description):
                 description.append_text("has row count ")
@@ -897,18 +992,17 @@ class QTableViewDriver(QWidgetDriver):
 
             def describe_mismatch(self, table, mismatch_description):
                 mismatch_description.append_text("row count ")
-                matching.describe_mismatch(table.row_count(), mismatch_description)
+                matching.describe_mismatch(self.last_value_of(table), mismatch_description)
 
         self.is_table(WithMatchingRowCount())
 
     def has_selected_row(self, matching):
-        class WithMatchingSelectedRow(BaseMatcher):
-            @staticmethod
-            def _selected_row(table):
+        class WithMatchingSelectedRow(match.EvaluatingMatcher):
+            def evaluate(self, table):
                 return table.cells(table.selected_row())
 
             def _matches(self, table):
-                return matching.matches(self._selected_row(table))
+                return matching.matches(self.value_of(table))
 
             def describe_to(self, description):
                 description.append_text('has selected row ')
@@ -916,7 +1010,7 @@ class QTableViewDriver(QWidgetDriver):
 
             def describe_mismatch(self, table, mismatch_description):
                 mismatch_description.append_text('selected row was ')
-                mismatch_description.append_description_of(self._selected_row(table))
+                mismatch_description.append_description_of(self.last_value_of(table))
 
         self.is_table(WithMatchingSelectedRow())
 
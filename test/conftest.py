@@ -2,7 +2,7 @@ import pytest
 import sip
 
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtWidgets import QMainWindow
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel
 
 from cute.animatron import Animatron
 from cute.prober import EventProcessingProber
@@ -41,3 +41,23 @@ class WidgetViewer(QMainWindow):
 def viewer(qt):
     return WidgetViewer()
 
+
+
+@pytest.fixture()
+def window(qt):
+    window = QMainWindow()
+    window.setCentralWidget(QWidget())
+    QVBoxLayout(window.centralWidget())
+    return window
+
+
+def add_label(parent, name, text=None):
+    label = QLabel(name if text is None else text)
+    label.setObjectName(name)
+    parent.layout().addWidget(label)
+    return label
+
+
+def found(finder):
+    finder.test()
+    return finder.widgets()
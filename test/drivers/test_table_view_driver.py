@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import pytest
+from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
+from hamcrest import assert_that, equal_to, contains
+
+from cute.widgets import QTableViewDriver, only_widget
+
+
+@pytest.fixture()
+def table(viewer):
+    table = QTableWidget(2, 1)
+    for row, text in enumerate(("first", "second")):
+        table.setItem(row, 0, QTableWidgetItem(text))
+    viewer.view(table)
+    return table
+
+
+@pytest.yield_fixture()
+def driver(prober, automaton):
+    driver = QTableViewDriver(only_widget(QTableWidget), prober, automaton)
+    yield driver
+    driver.close()
+
+
+def test_finds_matching_row_even_within_a_batch(table, driver):
+    with driver.batch():
+        row = driver.has_row(contains("second"))
+
+    assert_that(row, equal_to(1), "row")
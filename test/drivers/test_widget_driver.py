@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
+import time
+
 import pytest
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QWidget
-from hamcrest import assert_that, same_instance
+from PyQt5.QtCore import Qt, QCoreApplication, QEvent, QTimer
+from PyQt5.QtWidgets import QWidget, QLabel
+from hamcrest import assert_that, same_instance, all_of, contains_string, less_than, is_, contains, \
+    equal_to, greater_than
 from pytest import raises
 
-from cute import matchers
+from cute import matchers, properties
+from cute.finders import WidgetIdentity, WidgetSelector
 from cute.matchers import named
+from cute.prober import EventProcessingProber
 from cute.widgets import only_widget, QWidgetDriver
 
 
@@ -88,3 +93,122 @@ def test_asserts_window_title_text(widget, driver):
 
     with raises(AssertionError):
         driver.has_window_title("different title")
+
+
+def test_checks_assertions_made_in_a_batch_together(widget, driver):
+    widget.setToolTip("tooltip text")
+    widget.setWindowTitle("title")
+
+    with raises(AssertionError) as error:
+        with driver.batch():
+            driver.is_enabled()
+            driver.has_tooltip("different tooltip text")
+            driver.has_window_title("different title")
+
+    assert_that(str(error.value), all_of(contains_string("tooltip"), contains_string("window title")),
+                "error message")
+
+
+def test_fails_right_away_once_widget_is_destroyed(qt, automaton):
+    widget = QWidget()
+    widget.setObjectName("doomed")
+    driver = QWidgetDriver(WidgetIdentity(widget), EventProcessingProber(timeout_in_ms=5000), automaton)
+    widget.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    start_time = time.time()
+    with raises(AssertionError) as error:
+        driver.is_enabled()
+    assert_that(time.time() - start_time, less_than(0.5), "time to fail")
+    assert_that(str(error.value), contains_string("'doomed' was destroyed"), "error message")
+
+
+def test_branches_on_the_first_outcome_that_occurs(widget, driver):
+    missing = QWidgetDriver.find_single(driver, QWidget, matchers.named("does not exist"))
+    outcome = driver.check_first_of(missing.selector, driver.selector)
+
+    assert_that(outcome, same_instance(driver.selector), "outcome")
+
+
+def test_waits_until_application_is_idle(widget, driver):
+    timer = QTimer(widget)
+    timer.setSingleShot(True)
+    timer.start(50)
+
+    driver.wait_until_idle()
+    assert_that(timer.isActive(), is_(False), "timer active")
+
+
+def test_finds_widget_from_selector_query(widget, driver):
+    label = QLabel(widget)
+    label.setObjectName("label")
+
+    selected = QWidgetDriver.find_selected(driver, "QLabel#label")
+    assert_that(selected.widget(), same_instance(label), "selected widget")
+
+
+class SearchCountingSelector(WidgetSelector):
+    def __init__(self, selector):
+        super(SearchCountingSelector, self).__init__()
+        self._selector = selector
+        self.searches = 0
+
+    def is_satisfied(self):
+        return self._selector.is_satisfied()
+
+    def is_impossible(self):
+        return self._selector.is_impossible()
+
+    def widgets(self):
+        return self._selector.widgets()
+
+    def confirms(self, widget):
+        return self._selector.confirms(widget)
+
+    def test(self):
+        self.searches += 1
+        self._selector.test()
+
+    def describe_to(self, description):
+        self._selector.describe_to(description)
+
+    def describe_failure_to(self, description):
+        self._selector.describe_failure_to(description)
+
+
+@pytest.fixture()
+def selector():
+    return SearchCountingSelector(only_widget(QWidget, named("widget under test")))
+
+
+@pytest.yield_fixture()
+def pinnable_driver(selector, prober, automaton):
+    driver = QWidgetDriver(selector, prober, automaton)
+    yield driver
+    driver.close()
+
+
+def test_keeps_operating_on_pinned_widget_until_unpinned(widget, selector, pinnable_driver):
+    pinnable_driver.pin()
+    assert_that(pinnable_driver.widget(), same_instance(widget), "pinned widget")
+    searches = selector.searches
+    for _ in range(3):
+        pinnable_driver.widget()
+    assert_that(selector.searches, equal_to(searches), "searches while pinned")
+
+    widget.setParent(None)
+    assert_that(pinnable_driver.widget(), same_instance(widget), "widget once reparented")
+    assert_that(selector.searches, greater_than(searches), "searches once pin is released")
+
+    pinnable_driver.unpin()
+    searches = selector.searches
+    assert_that(pinnable_driver.widget(), same_instance(widget), "widget")
+    assert_that(selector.searches, greater_than(searches), "searches once unpinned")
+
+
+def test_queries_several_properties_at_once(widget, driver):
+    widget.setToolTip("tooltip")
+    widget.setWindowTitle("title")
+
+    assert_that(driver.query_many(properties.tooltip(), properties.window_title()), contains("tooltip", "title"),
+                "values")
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from PyQt5.QtWidgets import QLabel
+from hamcrest import assert_that, all_of, any_of, is_, equal_to, starts_with
+
+from cute import matchers, properties
+from cute.matchers import compile_matcher
+
+
+class CountingQuery(properties.PropertyQuery):
+    def __init__(self, cost):
+        super().__init__("counted", self._count, cost=cost)
+        self.evaluations = 0
+
+    def _count(self, widget):
+        self.evaluations += 1
+        return widget
+
+
+def test_compiled_matchers_agree_with_matchers(qt):
+    label = QLabel("text")
+    label.setObjectName("label")
+
+    for index, matcher in enumerate((all_of(matchers.named("label"), matchers.with_text("text"), matchers.enabled()),
+                                     all_of(matchers.named("label"), matchers.with_text("other")),
+                                     any_of(matchers.with_text(starts_with("t")), matchers.disabled()),
+                                     matchers.with_children(QLabel, equal_to([])))):
+        assert_that(compile_matcher(matcher)(label), is_(matcher.matches(label)), "matcher #{0}".format(index))
+
+
+def test_evaluates_cheap_checks_before_expensive_ones(qt):
+    label = QLabel()
+    label.setObjectName("label")
+    expensive = CountingQuery(properties.EXPENSIVE)
+
+    matches = compile_matcher(all_of(matchers.with_(expensive, label), matchers.named("other")))
+    assert_that(matches(label), is_(False), "matches")
+    assert_that(expensive.evaluations, equal_to(0), "expensive evaluations")
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from PyQt5.QtCore import QAbstractTableModel, Qt
+from PyQt5.QtWidgets import QLabel, QTableView
+from hamcrest import assert_that, contains_string, is_, equal_to
+from hamcrest.core.string_description import StringDescription
+
+from cute import matchers
+from cute.matchers import compile_matcher
+from cute.table import TableMatcher
+
+
+def mismatch_of(matcher, item):
+    description = StringDescription()
+    matcher.describe_mismatch(item, description)
+    return str(description)
+
+
+def test_describes_mismatch_with_the_text_that_failed(qt):
+    label = QLabel("first")
+    matcher = matchers.with_text("expected")
+    assert_that(matcher.matches(label), is_(False), "matches")
+
+    label.setText("changed")
+    assert_that(mismatch_of(matcher, label), contains_string("'first'"), "mismatch")
+
+
+def test_compiled_matchers_also_remember_the_text_that_failed(qt):
+    label = QLabel("first")
+    matcher = matchers.with_text("expected")
+    assert_that(compile_matcher(matcher)(label), is_(False), "matches")
+
+    label.setText("changed")
+    assert_that(mismatch_of(matcher, label), contains_string("'first'"), "mismatch")
+
+
+class Model(QAbstractTableModel):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def rowCount(self, parent=None):
+        return 1
+
+    def columnCount(self, parent=None):
+        return 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            self.reads += 1
+            return "cell"
+
+
+def test_describes_table_mismatch_without_reading_cells_again(qt):
+    model, table_view = Model(), QTableView()
+    table_view.setModel(model)
+
+    class WithCells(matchers.EvaluatingMatcher):
+        def evaluate(self, table):
+            return table.all_cells()
+
+        def _matches(self, table):
+            return self.value_of(table) == [["other"]]
+
+        def describe_mismatch(self, table, mismatch_description):
+            mismatch_description.append_description_of(self.last_value_of(table))
+
+    matcher = TableMatcher(WithCells())
+    assert_that(matcher.matches(table_view), is_(False), "matches")
+    reads = model.reads
+    assert_that(mismatch_of(matcher, table_view), contains_string("cell"), "mismatch")
+    assert_that(model.reads, equal_to(reads), "reads")
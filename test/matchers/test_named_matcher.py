@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
+from PyQt5.QtCore import QRegularExpression
 from PyQt5.QtWidgets import QLabel
-from hamcrest import assert_that
+from hamcrest import assert_that, all_of, equal_to, matches_regexp, instance_of
 from hamcrest import is_
 
 from cute import matchers
+from cute.matchers import NameLookup
 
 
 def test_matches_widgets_by_their_object_name(qt):
@@ -15,3 +17,16 @@ def test_matches_widgets_by_their_object_name(qt):
 
     label.setObjectName("other")
     assert_that(matcher.matches(label), is_(False), "other name")
+
+
+def test_hands_exact_names_over_to_native_lookups(qt):
+    lookup = NameLookup(all_of(matchers.named("label"), matchers.with_text("text")))
+
+    assert_that(lookup.native_argument, equal_to("label"), "native argument")
+    assert_that(lookup.remaining_criteria.matches(QLabel("text")), is_(True), "remaining criteria")
+
+
+def test_hands_name_patterns_over_to_native_lookups(qt):
+    lookup = NameLookup(matchers.named(matches_regexp("^field_")))
+
+    assert_that(lookup.native_argument, instance_of(QRegularExpression), "native argument")
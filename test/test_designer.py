@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import pytest
+from PyQt5 import uic
+from hamcrest import assert_that, same_instance, contains_string
+
+from cute import designer
+
+EXPORT_DIALOG = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>ExportDialog</class>
+ <widget class="QDialog" name="exportDialog">
+  <layout class="QVBoxLayout" name="layout">
+   <item>
+    <widget class="QGroupBox" name="options">
+     <layout class="QFormLayout" name="optionsLayout">
+      <item row="0" column="1">
+       <widget class="QComboBox" name="format"/>
+      </item>
+      <item row="1" column="1">
+       <widget class="QLineEdit" name="destinationPath"/>
+      </item>
+     </layout>
+    </widget>
+   </item>
+   <item>
+    <widget class="QTabWidget" name="tabs">
+     <widget class="QWidget" name="advancedPage">
+      <layout class="QVBoxLayout" name="advancedLayout">
+       <item>
+        <widget class="CompressionBox" name="compress"/>
+       </item>
+      </layout>
+     </widget>
+    </widget>
+   </item>
+   <item>
+    <widget class="QPushButton" name="refresh"/>
+   </item>
+  </layout>
+ </widget>
+ <customwidgets>
+  <customwidget>
+   <class>CompressionBox</class>
+   <extends>QCheckBox</extends>
+   <header>compression.h</header>
+  </customwidget>
+ </customwidgets>
+</ui>
+"""
+
+
+@pytest.fixture()
+def ui_file(tmpdir):
+    ui_file = tmpdir.join("export.ui")
+    ui_file.write(EXPORT_DIALOG)
+    return str(ui_file)
+
+
+def generated_drivers(ui_file):
+    namespace = {}
+    exec(designer.generate(ui_file), namespace)
+    return namespace
+
+
+def test_generates_typed_accessors_for_named_widgets(ui_file):
+    source = designer.generate(ui_file)
+
+    assert_that(source, contains_string('return QComboBoxDriver.find_by_path(self, QComboBox, "options", "format")'))
+    assert_that(source, contains_string("def destination_path(self):"))
+    assert_that(source, contains_string(
+        'return QButtonDriver.find_by_path(self, QCheckBox, "tabs", "advancedPage", "compress")'))
+    assert_that(source, contains_string("def refresh_widget(self):"))
+
+
+def test_generated_accessors_find_widgets_of_the_form(qt, prober, automaton, ui_file):
+    dialog = uic.loadUi(_without_custom_widgets(ui_file))
+    dialog.show()
+
+    driver = generated_drivers(ui_file)["ExportDialogDriver"].find_window(prober, automaton)
+    assert_that(driver.format().widget(), same_instance(dialog.format), "format")
+    assert_that(driver.destination_path().widget(), same_instance(dialog.destinationPath), "destination path")
+    assert_that(driver.compress().widget(), same_instance(dialog.compress), "compress")
+    dialog.close()
+
+
+def _without_custom_widgets(ui_file):
+    # The custom widget cannot be loaded, so load the widget it extends instead
+    with open(ui_file) as ui:
+        content = ui.read().replace('class="CompressionBox"', 'class="QCheckBox"')
+    plain_ui_file = ui_file.replace(".ui", "_plain.ui")
+    with open(plain_ui_file, "w") as ui:
+        ui.write(content)
+    return plain_ui_file
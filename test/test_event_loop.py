@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import time
+
+from PyQt5.QtCore import QTimer
+from hamcrest import assert_that, greater_than_or_equal_to, less_than, is_
+
+from cute import event_loop, gestures
+from cute.event_loop import VirtualClock, Timeout
+from cute.robot import Robot
+
+
+def test_processes_events_for_the_requested_duration(qt):
+    start_time = time.perf_counter()
+    overshoot = event_loop.process_events_for(3)
+    elapsed = (time.perf_counter() - start_time) * 1000
+
+    assert_that(elapsed, greater_than_or_equal_to(3), "elapsed time")
+    assert_that(elapsed, less_than(10), "elapsed time")
+    assert_that(overshoot, greater_than_or_equal_to(0), "overshoot")
+
+
+def test_delivers_events_while_waiting(qt):
+    timer_fired = []
+    QTimer.singleShot(5, lambda: timer_fired.append(True))
+
+    event_loop.process_events_for(20)
+    assert_that(timer_fired, is_([True]), "timer events")
+
+
+def test_honors_fractions_of_a_millisecond(qt):
+    start_time = time.perf_counter()
+    event_loop.process_events_for(0.5)
+    elapsed = (time.perf_counter() - start_time) * 1000
+
+    assert_that(elapsed, greater_than_or_equal_to(0.5), "elapsed time")
+    assert_that(elapsed, less_than(2), "elapsed time")
+
+
+def test_virtual_clock_jumps_forward_when_there_are_no_pending_events(qt):
+    clock = VirtualClock()
+    start_time = time.perf_counter()
+    virtual_start_time = clock.time()
+
+    clock.wait(500)
+
+    assert_that(time.perf_counter() - start_time, less_than(0.1), "real elapsed time")
+    assert_that(clock.time() - virtual_start_time, greater_than_or_equal_to(0.5), "virtual elapsed time")
+
+
+def test_virtual_clock_processes_pending_events_before_jumping_forward(qt):
+    timer_fired = []
+    QTimer.singleShot(0, lambda: timer_fired.append(True))
+
+    VirtualClock().wait(100)
+    assert_that(timer_fired, is_([True]), "timer events")
+
+
+def test_timeout_expires_according_to_its_clock(qt):
+    clock = VirtualClock()
+    timeout = Timeout(1000, clock)
+    assert_that(timeout.has_expired(), is_(False), "expired")
+
+    clock.wait(1000)
+    assert_that(timeout.has_expired(), is_(True), "expired")
+
+
+def test_gesture_pauses_follow_the_automaton_clock(qt):
+    start_time = time.perf_counter()
+    Robot(VirtualClock()).perform(gestures.pause_to_avoid_double_click())
+
+    assert_that(time.perf_counter() - start_time, less_than(0.1), "real elapsed time")
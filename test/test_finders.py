@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QApplication, QLabel, QWidget, QVBoxLayout, QMainWindow
+from hamcrest import assert_that, contains_inanyorder, empty, matches_regexp, all_of, has_length, equal_to, contains, \
+    contains_string, same_instance, anything
+from hamcrest.core.string_description import StringDescription
+
+from cute.matchers import named, with_text
+from cute.finders import Traversal, SingleWidgetFinder, NthWidgetFinder, PinnedSelector, RecursiveWidgetFinder, \
+    WidgetIdentity
+from cute.widgets import all_widgets
+from .conftest import add_label, found
+
+
+def test_finds_widgets_by_exact_name(window):
+    label = add_label(window.centralWidget(), "label")
+    add_label(window.centralWidget(), "other label")
+
+    assert_that(found(all_widgets(QLabel, named("label"))), contains_inanyorder(label), "labels")
+    assert_that(found(all_widgets(QLabel, named("missing"))), empty(), "labels")
+
+
+def test_finds_widgets_by_name_pattern(window):
+    first, second = add_label(window.centralWidget(), "field_1"), add_label(window.centralWidget(), "field_2")
+    add_label(window.centralWidget(), "title")
+
+    assert_that(found(all_widgets(QLabel, named(matches_regexp(r"^field_\d$")))),
+                contains_inanyorder(first, second), "labels")
+
+
+def test_finds_widgets_by_name_pattern_matching_unicode_characters(window):
+    digits, word = add_label(window.centralWidget(), "field_\u0663"), add_label(window.centralWidget(), "\u00e9t\u00e9")
+
+    assert_that(found(all_widgets(QLabel, named(matches_regexp(r"^field_\d$")))), contains(digits), "labels by digit")
+    assert_that(found(all_widgets(QLabel, named(matches_regexp(r"^\w{3}$")))), contains(word), "labels by word")
+
+
+def test_matches_remaining_criteria_on_widgets_found_by_name(window):
+    add_label(window.centralWidget(), "label", text="first")
+    second = add_label(window.centralWidget(), "label", text="second")
+
+    assert_that(found(all_widgets(QLabel, all_of(named("label"), with_text("second")))),
+                contains_inanyorder(second), "labels")
+
+
+def test_visits_each_widget_once(window):
+    for name in ("first", "second", "third"):
+        add_label(window.centralWidget(), name)
+
+    finder = all_widgets(QLabel)
+    assert_that(found(finder), has_length(3), "labels")
+    assert_that(finder.nodes_visited, equal_to(4), "nodes visited")
+
+
+def test_skips_hidden_subtrees_when_asked_to(window):
+    shown = add_label(window.centralWidget(), "shown")
+    hidden_panel = QWidget()
+    QVBoxLayout(hidden_panel)
+    window.centralWidget().layout().addWidget(hidden_panel)
+    add_label(hidden_panel, "hidden")
+    window.show()
+    hidden_panel.hide()
+
+    assert_that(found(all_widgets(QLabel, traversal=Traversal(skip_hidden=True))), contains_inanyorder(shown),
+                "labels")
+    window.close()
+
+
+def test_searches_only_the_active_window_when_asked_to(window):
+    active = add_label(window.centralWidget(), "active")
+    other_window = QMainWindow()
+    other_window.setCentralWidget(QWidget())
+    QVBoxLayout(other_window.centralWidget())
+    add_label(other_window.centralWidget(), "inactive")
+    other_window.show()
+    window.show()
+    QApplication.setActiveWindow(window)
+
+    traversal = Traversal(active_window_only=True)
+    assert_that(found(all_widgets(QLabel, traversal=traversal)), contains(active), "labels in all windows")
+    assert_that(found(RecursiveWidgetFinder(QLabel, anything(), WidgetIdentity(window.centralWidget()), traversal)),
+                contains(active), "labels within the active window")
+    assert_that(found(RecursiveWidgetFinder(QLabel, anything(), WidgetIdentity(other_window.centralWidget()),
+                                            traversal)), empty(), "labels within an inactive window")
+    other_window.close()
+    window.close()
+
+
+def test_stops_at_first_match_when_asked_to(window):
+    for name in ("first", "second", "third"):
+        add_label(window.centralWidget(), name)
+
+    finder = all_widgets(QLabel, traversal=Traversal(first_match_only=True))
+    assert_that(found(finder), has_length(1), "labels")
+
+
+def test_finds_widgets_in_tree_order(window):
+    labels = [add_label(window.centralWidget(), name) for name in ("first", "second", "third")]
+
+    assert_that(found(all_widgets(QLabel)), contains(*labels), "labels")
+
+
+def test_stops_searching_once_enough_widgets_are_found(window):
+    for name in ("first", "second", "third", "fourth"):
+        add_label(window.centralWidget(), name)
+
+    finder = all_widgets(QLabel)
+    single = SingleWidgetFinder(finder)
+    single.test()
+    assert_that(finder.widgets(), has_length(2), "widgets found")
+
+    visited = finder.nodes_visited
+    description = StringDescription()
+    single.describe_failure_to(description)
+    assert_that(str(description), contains_string("found more than one"), "failure description")
+    assert_that(finder.nodes_visited, equal_to(visited), "nodes visited to describe the failure")
+
+
+def test_leaves_no_limit_on_finders_shared_with_other_consumers(window):
+    for name in ("first", "second", "third"):
+        add_label(window.centralWidget(), name)
+
+    finder = all_widgets(QLabel)
+    SingleWidgetFinder(finder).test()
+    assert_that(found(finder), has_length(3), "widgets found")
+
+
+def test_selects_nth_widget_in_tree_order(window):
+    labels = [add_label(window.centralWidget(), name) for name in ("first", "second", "third")]
+
+    nth = NthWidgetFinder(all_widgets(QLabel), 1)
+    nth.test()
+    assert_that(nth.widget(), same_instance(labels[1]), "second label")
+
+    beyond = NthWidgetFinder(all_widgets(QLabel), 5)
+    beyond.test()
+    assert_that(beyond.widgets(), empty(), "widgets beyond the last one")
+
+
+def test_holds_on_to_pinned_widget_while_it_meets_the_criteria(window):
+    label = add_label(window.centralWidget(), "label")
+    pinned = PinnedSelector(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+    pinned.test()
+
+    other = add_label(window.centralWidget(), "label")
+    pinned.test()
+    assert_that(pinned.widget(), same_instance(label), "pinned widget")
+
+    label.setObjectName("renamed")
+    pinned.test()
+    assert_that(pinned.widget(), same_instance(other), "widget found once pin is released")
+
+
+def test_searches_again_once_pinned_widget_is_destroyed(window):
+    label = add_label(window.centralWidget(), "label")
+    pinned = PinnedSelector(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+    pinned.test()
+    assert_that(pinned.is_satisfied(), equal_to(True), "found")
+
+    label.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    pinned.test()
+    assert_that(pinned.is_satisfied(), equal_to(False), "found after widget was destroyed")
+
+
+def test_searches_again_once_pinned_widget_is_reparented(window):
+    label = add_label(window.centralWidget(), "label")
+    pinned = PinnedSelector(SingleWidgetFinder(
+        RecursiveWidgetFinder(QLabel, named("label"), SingleWidgetFinder(all_widgets(QMainWindow)))))
+    pinned.test()
+
+    elsewhere = QWidget()
+    label.setParent(elsewhere)
+    pinned.test()
+    assert_that(pinned.is_satisfied(), equal_to(False), "found after widget was moved out of the window")
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import pytest
+from PyQt5.QtWidgets import QLabel
+from hamcrest import assert_that, contains, equal_to, greater_than
+
+from cute import hints
+from cute.finders import SingleWidgetFinder, MissingWidgetFinder, NthWidgetFinder
+from cute.matchers import named
+from cute.widgets import all_widgets
+from .conftest import add_label, found
+
+
+@pytest.yield_fixture()
+def hints_file(tmpdir):
+    yield str(tmpdir.join("hints.json"))
+    hints.uninstall()
+
+
+def test_follows_hinted_path_instead_of_searching_once_widget_was_found(hints_file, window):
+    path_hints = hints.install(hints_file)
+    add_label(window.centralWidget(), "label")
+    found(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+
+    labels = all_widgets(QLabel, named("label"))
+    missing = MissingWidgetFinder(labels)
+    missing.test()
+    assert_that(missing.is_satisfied(), equal_to(False), "missing")
+    assert_that(labels.nodes_visited, equal_to(0), "nodes visited")
+    assert_that((path_hints.misses, path_hints.hits), equal_to((0, 1)), "misses and hits")
+
+
+def test_reads_hints_recorded_by_previous_runs(hints_file, window):
+    hints.install(hints_file)
+    add_label(window.centralWidget(), "label")
+    found(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+    hints.uninstall()
+
+    path_hints = hints.install(hints_file)
+    missing = MissingWidgetFinder(all_widgets(QLabel, named("label")))
+    missing.test()
+    assert_that(missing.is_satisfied(), equal_to(False), "missing")
+    assert_that(path_hints.hit_rate, equal_to(1), "hit rate")
+
+
+def test_searches_again_when_hint_has_gone_stale(hints_file, window):
+    path_hints = hints.install(hints_file)
+    label = add_label(window.centralWidget(), "label")
+    found(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+
+    label.setObjectName("renamed")
+    missing = MissingWidgetFinder(all_widgets(QLabel, named("label")))
+    missing.test()
+    assert_that(missing.is_satisfied(), equal_to(True), "missing")
+    assert_that(path_hints.stale, equal_to(1), "stale hints")
+
+
+def test_still_tells_hinted_widget_is_no_longer_unique(hints_file, window):
+    hints.install(hints_file)
+    add_label(window.centralWidget(), "label")
+    found(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+
+    add_label(window.centralWidget(), "label")
+    single = SingleWidgetFinder(all_widgets(QLabel, named("label")))
+    single.test()
+    assert_that(single.is_satisfied(), equal_to(False), "unique")
+
+
+def test_still_finds_all_widgets_when_there_is_no_limit(hints_file, window):
+    hints.install(hints_file)
+    labels = [add_label(window.centralWidget(), "first")]
+    found(SingleWidgetFinder(all_widgets(QLabel)))
+
+    labels += [add_label(window.centralWidget(), name) for name in ("second", "third")]
+    assert_that(found(all_widgets(QLabel)), contains(*labels), "all widgets")
+    nth = NthWidgetFinder(all_widgets(QLabel), 2)
+    nth.test()
+    assert_that(nth.widgets(), contains(labels[2]), "nth widget")
+
+
+def test_always_searches_when_widget_must_be_unique(hints_file, window):
+    path_hints = hints.install(hints_file)
+    label = add_label(window.centralWidget(), "label")
+    found(SingleWidgetFinder(all_widgets(QLabel, named("label"))))
+
+    labels = all_widgets(QLabel, named("label"))
+    assert_that(found(SingleWidgetFinder(labels)), contains(label), "widgets")
+    assert_that(labels.nodes_visited, greater_than(0), "nodes visited")
+    assert_that((path_hints.misses, path_hints.hits), equal_to((0, 0)), "misses and hits")
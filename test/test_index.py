@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import pytest
+from PyQt5.QtCore import QCoreApplication, QEvent
+from PyQt5.QtWidgets import QLabel, QWidget
+from hamcrest import assert_that, contains, contains_inanyorder, equal_to, empty
+
+from cute import index, event_loop
+from cute.matchers import named
+from cute.widgets import all_widgets
+from .conftest import add_label, found
+
+
+@pytest.yield_fixture()
+def widget_index(qt):
+    yield index.install(qt)
+    index.uninstall()
+
+
+def test_finds_widgets_from_index(widget_index, window):
+    first, second = add_label(window.centralWidget(), "first"), add_label(window.centralWidget(), "second")
+
+    assert_that(found(all_widgets(QLabel)), contains_inanyorder(first, second), "labels")
+    assert_that(found(all_widgets(QLabel, named("second"))), contains_inanyorder(second), "named labels")
+
+
+def test_keeps_index_up_to_date_with_widget_tree_changes(widget_index, window):
+    label = add_label(window.centralWidget(), "label")
+    finder = all_widgets(QLabel)
+    assert_that(found(finder), contains_inanyorder(label), "labels")
+
+    other_label = add_label(window.centralWidget(), "other")
+    event_loop.process_pending_events()
+    assert_that(found(finder), contains_inanyorder(label, other_label), "labels")
+
+    label.setParent(None)
+    assert_that(found(finder), contains_inanyorder(other_label, label), "labels")
+
+    label.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert_that(found(finder), contains_inanyorder(other_label), "labels")
+
+
+def test_only_indexes_widgets_added_to_widget_trees(widget_index, window):
+    add_label(window.centralWidget(), "label")
+    finder = all_widgets(QLabel)
+    found(finder)
+    indexed = widget_index.objects_indexed
+
+    for _ in range(10):
+        found(finder)
+    assert_that(widget_index.objects_indexed, equal_to(indexed), "objects indexed while unchanged")
+
+    add_label(window.centralWidget(), "other")
+    found(finder)
+    assert_that(widget_index.objects_indexed, equal_to(indexed + 1), "objects indexed after change")
+
+
+def test_finds_indexed_widgets_in_tree_order(widget_index, window):
+    first, second = QWidget(window.centralWidget()), QWidget(window.centralWidget())
+    found(all_widgets(QLabel))
+
+    later, earlier = QLabel(second), QLabel(first)
+    assert_that(found(all_widgets(QLabel)), contains(earlier, later), "labels")
+
+
+def test_matches_current_names_of_indexed_widgets(widget_index, window):
+    label = add_label(window.centralWidget(), "before")
+    finder = all_widgets(QLabel, named("after"))
+    assert_that(found(finder), empty(), "labels")
+
+    label.setObjectName("after")
+    assert_that(found(finder), contains_inanyorder(label), "labels")
+
+
+def test_finds_renamed_widgets_by_name(widget_index, window):
+    label = add_label(window.centralWidget(), "before")
+    assert_that(found(all_widgets(QLabel, named("before"))), contains(label), "labels before renaming")
+
+    label.setObjectName("after")
+    assert_that(found(all_widgets(QLabel, named("before"))), empty(), "labels with old name")
+    assert_that(found(all_widgets(QLabel, named("after"))), contains(label), "labels with new name")
+
+
+def test_looks_up_widgets_by_name_in_index(widget_index, window):
+    for name in ("first", "second", "third"):
+        add_label(window.centralWidget(), name)
+
+    finder = all_widgets(QLabel, named("second"))
+    found(finder)
+    assert_that(finder.nodes_visited, equal_to(2), "nodes visited")
@@ -1,9 +1,15 @@
 import pytest
+import sip
 import time
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal, qCritical
+from PyQt5.QtWidgets import QWidget, QLabel
 from pytest import raises
-from hamcrest import assert_that, contains_string
+from hamcrest import assert_that, contains_string, less_than, contains, all_of, greater_than_or_equal_to, \
+    less_than_or_equal_to, only_contains, equal_to, is_not, same_instance
 
-from cute.prober import EventProcessingProber, Probe
+from cute.prober import EventProcessingProber, EventDrivenProber, Probe, exponential_backoff, jittered, \
+    constant_delay, run_test_once, first_of
+from cute.widgets import all_widgets
 
 
 @pytest.fixture()
@@ -51,4 +57,302 @@ def test_repeatedly_polls_probe_until_it_is_satisfied(prober):
         def describe_to(self, description):
             description.append_text("probe to succeed after 100ms")
 
-    prober.check(EventuallySuccessfulProbe())
\ No newline at end of file
+    prober.check(EventuallySuccessfulProbe())
+
+
+class VisibilityProbe(Probe):
+    def __init__(self, widget):
+        self._widget = widget
+
+    def is_satisfied(self):
+        return self._widget.isVisible()
+
+    def describe_to(self, description):
+        description.append_text("widget to show")
+
+    def describe_failure_to(self, description):
+        description.append_text("widget was hidden")
+
+
+def test_event_driven_prober_reevaluates_probe_as_soon_as_a_relevant_event_occurs(qt):
+    prober = EventDrivenProber(fallback_delay_in_ms=1000, timeout_in_ms=2000)
+    widget = QWidget()
+    QTimer.singleShot(20, widget.show)
+
+    start_time = time.time()
+    prober.check(VisibilityProbe(widget))
+    assert_that(time.time() - start_time, less_than(0.5), "time to satisfy probe")
+
+
+def test_event_driven_prober_wakes_up_on_watched_signals(qt):
+    class Model(QObject):
+        changed = pyqtSignal(int)
+
+        def __init__(self):
+            super().__init__()
+            self.value = 0
+
+        def update(self):
+            self.value = 42
+            self.changed.emit(self.value)
+
+    class ModelValueProbe(Probe):
+        def __init__(self, model):
+            self._model = model
+
+        def is_satisfied(self):
+            return self._model.value == 42
+
+    model = Model()
+    prober = EventDrivenProber(fallback_delay_in_ms=1000, timeout_in_ms=2000)
+    prober.watch(model.changed)
+    QTimer.singleShot(20, model.update)
+
+    start_time = time.time()
+    prober.check(ModelValueProbe(model))
+    assert_that(time.time() - start_time, less_than(0.5), "time to satisfy probe")
+
+
+def test_event_driven_prober_wakes_up_on_repaints_of_changed_widgets(qt):
+    class TextProbe(Probe):
+        def __init__(self, label):
+            self._label = label
+
+        def is_satisfied(self):
+            return self._label.text() == "changed"
+
+    label = QLabel("original")
+    label.show()
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(lambda: label.setText("changed"))
+    timer.start(20)
+
+    prober = EventDrivenProber(fallback_delay_in_ms=1000, timeout_in_ms=2000)
+    start_time = time.time()
+    prober.check(TextProbe(label))
+    assert_that(time.time() - start_time, less_than(0.5), "time to satisfy probe")
+
+
+def test_event_driven_prober_stops_watching_signals_once_done_checking(qt):
+    class Model(QObject):
+        changed = pyqtSignal()
+
+    model = Model()
+    prober = EventDrivenProber(fallback_delay_in_ms=10, timeout_in_ms=100)
+    prober.watch(model.changed)
+    prober.check(CountingProbe())
+
+    assert_that(model.receivers(model.changed), equal_to(0), "connections left")
+
+
+def test_event_driven_prober_falls_back_to_timeout(qt):
+    prober = EventDrivenProber(fallback_delay_in_ms=10, timeout_in_ms=100)
+
+    with raises(AssertionError) as error:
+        prober.check(VisibilityProbe(QWidget()))
+
+    assert_that(str(error.value), contains_string("widget was hidden"), "error message")
+
+
+def first(count, delays):
+    return [next(delays) for _ in range(count)]
+
+
+def test_exponential_backoff_polls_again_right_away_then_backs_off_up_to_a_maximum_delay():
+    schedule = exponential_backoff(initial_delay=1, factor=2, max_delay=10)
+    assert_that(first(7, schedule.delays()), contains(0, 1, 2, 4, 8, 10, 10), "delays")
+
+
+def test_jittered_schedule_randomizes_delays_around_those_of_its_schedule():
+    schedule = jittered(constant_delay(100), jitter=0.2)
+    assert_that(first(20, schedule.delays()),
+                only_contains(all_of(greater_than_or_equal_to(80), less_than_or_equal_to(120))), "delays")
+
+
+def test_polls_probe_following_schedule(qt):
+    class CountingProbe(Probe):
+        def __init__(self):
+            self.polls = 0
+
+        def test(self):
+            self.polls += 1
+
+        def is_satisfied(self):
+            return self.polls == 5
+
+    prober = EventProcessingProber(timeout_in_ms=1000, schedule=exponential_backoff(initial_delay=1, max_delay=5))
+    start_time = time.time()
+    prober.check(CountingProbe())
+    assert_that(time.time() - start_time, less_than(0.25), "time to satisfy probe")
+
+
+class CountingProbe(Probe):
+    def __init__(self, satisfied=True, name="probe"):
+        self.tests = 0
+        self._satisfied = satisfied
+        self._name = name
+
+    def test(self):
+        self.tests += 1
+
+    def is_satisfied(self):
+        return self._satisfied
+
+    def describe_to(self, description):
+        description.append_text(self._name)
+
+    def describe_failure_to(self, description):
+        description.append_text("{0} failed".format(self._name))
+
+
+class DependentProbe(Probe):
+    def __init__(self, selector):
+        self._selector = selector
+
+    def test(self):
+        run_test_once(self._selector)
+
+    def is_satisfied(self):
+        return self._selector.is_satisfied()
+
+
+def test_checks_all_probes_in_a_single_polling_loop(prober):
+    first, second = CountingProbe(), CountingProbe()
+    prober.check_all(first, second)
+
+    assert_that(first.tests, equal_to(1), "first probe tests")
+    assert_that(second.tests, equal_to(1), "second probe tests")
+
+
+def test_tests_shared_probes_once_per_poll_when_checking_all(prober):
+    shared = CountingProbe()
+    prober.check_all(DependentProbe(shared), DependentProbe(shared), DependentProbe(shared))
+
+    assert_that(shared.tests, equal_to(1), "shared probe tests")
+
+
+def test_resolves_shared_probes_again_on_each_poll(prober):
+    shared = CountingProbe()
+    prober.check(DependentProbe(shared))
+    prober.check(DependentProbe(shared))
+    assert_that(shared.tests, equal_to(2), "shared probe tests")
+
+
+def test_sees_widgets_changed_directly_between_two_checks(qt):
+    class LabelCountProbe(Probe):
+        def __init__(self, finder, count):
+            self._finder = finder
+            self._count = count
+
+        def test(self):
+            run_test_once(self._finder)
+
+        def is_satisfied(self):
+            return len(self._finder.widgets()) == self._count
+
+    window = QWidget()
+    QLabel(window)
+    labels = all_widgets(QLabel)
+    # Without a timeout, each check polls only once
+    prober = EventProcessingProber(timeout_in_ms=0)
+    prober.check(LabelCountProbe(labels, 1))
+
+    QLabel(window)
+    prober.check(LabelCountProbe(labels, 2))
+
+    for label in window.findChildren(QLabel):
+        sip.delete(label)
+    prober.check(LabelCountProbe(labels, 0))
+
+
+def test_reports_all_unsatisfied_probes_at_once(prober):
+    with raises(AssertionError) as error:
+        prober.check_all(CountingProbe(satisfied=False, name="first"),
+                         CountingProbe(satisfied=True, name="second"),
+                         CountingProbe(satisfied=False, name="third"))
+
+    assert_that(str(error.value), all_of(contains_string("first failed"),
+                                         is_not(contains_string("second failed")),
+                                         contains_string("third failed")), "error message")
+
+
+def test_defers_checks_issued_in_a_batch_until_the_batch_ends(prober):
+    probe = CountingProbe()
+    with prober.batch():
+        prober.check(probe)
+        assert_that(probe.tests, equal_to(0), "tests within batch")
+
+    assert_that(probe.tests, equal_to(1), "tests after batch")
+
+
+def test_fails_as_soon_as_probe_can_no_longer_be_satisfied(qt):
+    class ImpossibleProbe(CountingProbe):
+        def is_impossible(self):
+            return True
+
+    prober = EventProcessingProber(timeout_in_ms=5000)
+    start_time = time.time()
+    with raises(AssertionError):
+        prober.check(ImpossibleProbe(satisfied=False))
+    assert_that(time.time() - start_time, less_than(0.5), "time to fail")
+
+
+def test_waits_for_the_first_satisfied_of_several_probes(prober):
+    never, eventually = CountingProbe(satisfied=False, name="never"), CountingProbe(satisfied=True)
+    outcome = first_of(never, eventually)
+    prober.check(outcome)
+
+    assert_that(outcome.satisfied_probe, same_instance(eventually), "satisfied probe")
+
+
+def test_reports_all_alternatives_when_none_is_satisfied(prober):
+    with raises(AssertionError) as error:
+        prober.check(first_of(CountingProbe(satisfied=False, name="first"),
+                              CountingProbe(satisfied=False, name="second")))
+
+    assert_that(str(error.value), all_of(contains_string("either first\nor second"),
+                                         contains_string("first failed"),
+                                         contains_string("second failed")), "error message")
+
+
+def test_shares_a_deadline_between_all_checks_issued_within_a_budget(qt):
+    prober = EventProcessingProber(timeout_in_ms=1000)
+    start_time = time.time()
+
+    with raises(AssertionError) as error:
+        with prober.budget(200):
+            prober.check(CountingProbe(name="first"))
+            for _ in range(5):
+                prober.check(CountingProbe(satisfied=False, name="failing"))
+
+    assert_that(time.time() - start_time, less_than(0.5), "time to fail")
+    assert_that(str(error.value), all_of(contains_string("budget of 200ms"),
+                                         contains_string("to check first"),
+                                         contains_string("to check failing")), "error message")
+
+
+def test_fails_right_away_when_application_raises_an_error_while_checking(qt):
+    def failing_slot():
+        raise ValueError("application failure")
+
+    prober = EventProcessingProber(timeout_in_ms=5000, fail_on_errors=True)
+    QTimer.singleShot(10, failing_slot)
+
+    start_time = time.time()
+    with raises(AssertionError) as error:
+        prober.check(CountingProbe(satisfied=False, name="never"))
+
+    assert_that(time.time() - start_time, less_than(0.5), "time to fail")
+    assert_that(str(error.value), all_of(contains_string("never failed"),
+                                         contains_string("ValueError: application failure")), "error message")
+
+
+def test_fails_right_away_when_qt_reports_a_critical_error_while_checking(qt):
+    prober = EventProcessingProber(timeout_in_ms=5000, fail_on_errors=True)
+    QTimer.singleShot(10, lambda: qCritical(b"critical failure"))
+
+    with raises(AssertionError) as error:
+        prober.check(CountingProbe(satisfied=False, name="never"))
+
+    assert_that(str(error.value), contains_string("critical failure"), "error message")
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+import time
+
+from PyQt5.QtCore import QTimer, Qt, QVariantAnimation, QObject, pyqtSignal, QRect, QPoint
+from PyQt5.QtGui import QCursor, QGuiApplication
+from PyQt5.QtWidgets import QWidget
+from hamcrest import assert_that, is_, contains_string, greater_than_or_equal_to, contains, empty, equal_to, \
+    greater_than, none
+from hamcrest.core.string_description import StringDescription
+from pytest import raises
+
+from cute import event_loop
+from cute import matchers
+from cute.finders import WidgetIdentity
+from cute.prober import EventProcessingProber
+from cute.probes import ApplicationIdleProbe, WidgetGestureProbe, screen_center_of, emission_count, \
+    last_emitted_value, emitted_values, MultiValueMatcherProbe, within_screen_bounds
+
+
+def failure_of(probe):
+    description = StringDescription()
+    probe.describe_failure_to(description)
+    return str(description)
+
+
+def test_application_idle_probe_is_satisfied_when_nothing_is_going_on(qt):
+    event_loop.process_pending_events()
+    probe = ApplicationIdleProbe(qt)
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(True), "idle")
+
+
+def test_application_idle_probe_waits_for_short_timers_to_fire(qt, prober):
+    widget = QWidget()
+    timer = QTimer(widget)
+    timer.setSingleShot(True)
+    timer.start(100)
+
+    probe = ApplicationIdleProbe(qt)
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(False), "idle")
+    assert_that(failure_of(probe), contains_string("1 timer(s) were about to fire"), "failure")
+
+    start_time = time.time()
+    prober.check(probe)
+    assert_that(time.time() - start_time, greater_than_or_equal_to(0.05), "time to settle")
+
+
+def test_application_idle_probe_waits_for_running_animations(qt):
+    widget = QWidget()
+    animation = QVariantAnimation(widget)
+    animation.setStartValue(0)
+    animation.setEndValue(1)
+    animation.setDuration(1000)
+    animation.start()
+
+    probe = ApplicationIdleProbe(qt)
+    probe.test()
+    assert_that(failure_of(probe), contains_string("1 animation(s) were running"), "failure")
+
+
+def test_application_idle_probe_waits_for_busy_cursor_to_be_restored(qt):
+    QGuiApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
+    probe = ApplicationIdleProbe(qt)
+    probe.test()
+    QGuiApplication.restoreOverrideCursor()
+
+    assert_that(failure_of(probe), contains_string("cursor was busy"), "failure")
+
+
+class RecordingPerformer:
+    def __init__(self):
+        self.gestures = []
+
+    def perform(self, *gestures):
+        self.gestures.extend(gestures)
+
+
+def click_probe(widget, performer):
+    return WidgetGestureProbe(WidgetIdentity(widget), matchers.enabled(), screen_center_of,
+                              lambda point: ("click", point), performer, "click on it")
+
+
+def test_widget_gesture_probe_performs_gesture_once_at_located_point(qt):
+    widget = QWidget()
+    widget.resize(100, 50)
+    widget.show()
+    performer = RecordingPerformer()
+
+    probe = click_probe(widget, performer)
+    probe.test()
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(True), "performed")
+    assert_that(performer.gestures, contains(("click", screen_center_of(widget))), "gestures")
+    widget.close()
+
+
+def test_widget_gesture_probe_waits_for_preconditions_to_hold(qt):
+    widget = QWidget()
+    widget.setEnabled(False)
+    widget.show()
+    performer = RecordingPerformer()
+
+    probe = click_probe(widget, performer)
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(False), "performed")
+    assert_that(performer.gestures, empty(), "gestures")
+    assert_that(failure_of(probe), contains_string("it was disabled"), "failure")
+    widget.close()
+
+
+def test_locates_points_within_screen_bounds_of_widgets_showing_on_screen(qt):
+    widget = QWidget()
+    widget.resize(100, 50)
+    top_left = within_screen_bounds(QRect.topLeft)
+    assert_that(top_left(widget), none(), "point while hidden")
+
+    widget.show()
+    assert_that(top_left(widget), equal_to(widget.mapToGlobal(QPoint(0, 0))), "point once shown")
+    widget.close()
+
+
+class Progress(QObject):
+    valueChanged = pyqtSignal(int)
+
+
+def test_signal_probe_matches_count_of_emissions(qt):
+    progress = Progress()
+    probe = emission_count(progress.valueChanged, greater_than(2))
+
+    for value in range(3):
+        progress.valueChanged.emit(value)
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(True), "satisfied")
+
+
+def test_signal_probe_keeps_only_latest_emissions(qt):
+    progress = Progress()
+    probe = emitted_values(progress.valueChanged, contains(98, 99), capacity=2)
+
+    for value in range(100):
+        progress.valueChanged.emit(value)
+    probe.test()
+    assert_that(probe.is_satisfied(), is_(True), "satisfied")
+    assert_that(probe.count, equal_to(100), "emissions")
+    assert_that(probe.emissions[0].timestamp, is_(greater_than(0)), "timestamp")
+
+
+def test_signal_probe_disconnects_once_satisfied(qt):
+    progress = Progress()
+    probe = last_emitted_value(progress.valueChanged, 1)
+
+    progress.valueChanged.emit(1)
+    probe.test()
+    progress.valueChanged.emit(2)
+    assert_that(probe.last_value, equal_to(1), "last value")
+
+
+def test_signal_probe_disconnects_once_its_check_fails(qt):
+    progress = Progress()
+    probe = last_emitted_value(progress.valueChanged, 1)
+
+    with raises(AssertionError):
+        EventProcessingProber(timeout_in_ms=0).check(probe)
+    assert_that(progress.receivers(progress.valueChanged), equal_to(0), "connections left")
+
+
+def test_signal_probe_disconnects_when_leaving_context(qt):
+    progress = Progress()
+    with emission_count(progress.valueChanged, 5) as probe:
+        progress.valueChanged.emit(1)
+    progress.valueChanged.emit(2)
+    assert_that(probe.count, equal_to(1), "emissions")
+
+
+def test_signal_probe_reports_signal_that_was_never_emitted(qt):
+    progress = Progress()
+    probe = last_emitted_value(progress.valueChanged, 1)
+    probe.test()
+    assert_that(failure_of(probe), contains_string("signal valueChanged(int) was not emitted"), "failure")
+
+
+def test_matches_values_received_against_list_matchers():
+    probe = MultiValueMatcherProbe("values", equal_to([1, 2]))
+    probe.received(1, 2)
+    assert_that(probe.is_satisfied(), is_(True), "satisfied")
+
+    bounded = MultiValueMatcherProbe("values", equal_to([2, 3]), capacity=2)
+    bounded.received(1, 2, 3)
+    assert_that(bounded.is_satisfied(), is_(True), "satisfied with a capacity")
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import time
+
+from PyQt5.QtCore import QObject, pyqtProperty, pyqtSignal
+from PyQt5.QtWidgets import QLineEdit
+from hamcrest import assert_that, equal_to, contains, less_than
+
+from cute import properties
+from cute.event_loop import ChangeWatcher
+from cute.finders import WidgetIdentity
+from cute.prober import EventDrivenProber
+from cute.probes import WidgetPropertyAssertionProbe
+from cute.properties import PropertyQuery
+
+
+class Widget:
+    def __init__(self):
+        self.reads = 0
+
+    def text(self):
+        self.reads += 1
+        return "text"
+
+
+def read_text(widget):
+    return widget.text()
+
+
+def text_query():
+    return PropertyQuery("text", read_text)
+
+
+def test_reads_each_property_once_within_a_snapshot():
+    widget = Widget()
+    with properties.snapshot():
+        for _ in range(3):
+            assert_that(text_query()(widget), equal_to("text"), "text")
+    assert_that(widget.reads, equal_to(1), "reads")
+
+
+def test_reads_properties_again_outside_of_a_snapshot():
+    widget = Widget()
+    with properties.snapshot():
+        text_query()(widget)
+    text_query()(widget)
+    assert_that(widget.reads, equal_to(2), "reads")
+
+
+def test_shares_outermost_snapshot_with_nested_scopes():
+    widget = Widget()
+    with properties.snapshot():
+        text_query()(widget)
+        with properties.snapshot():
+            text_query()(widget)
+    assert_that(widget.reads, equal_to(1), "reads")
+
+
+def test_tells_apart_queries_that_share_a_name():
+    widget = Widget()
+    with properties.snapshot():
+        assert_that(PropertyQuery("text", lambda w: "first")(widget), equal_to("first"), "first query")
+        assert_that(PropertyQuery("text", lambda w: "second")(widget), equal_to("second"), "second query")
+        assert_that(text_query()(widget), equal_to("text"), "text query")
+
+
+def test_reads_several_properties_at_once():
+    assert_that(properties.PropertySnapshot().read(Widget(), text_query(), PropertyQuery("reads", lambda w: w.reads)),
+                contains("text", 1), "values")
+
+
+class Gauge(QObject):
+    levelChanged = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self._level = 0
+        self.reads = 0
+
+    @pyqtProperty(int, notify=levelChanged)
+    def level(self):
+        self.reads += 1
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        self._level = level
+        self.levelChanged.emit(level)
+
+
+def test_reads_any_qt_property_by_name(qt):
+    line_edit = QLineEdit("text")
+    assert_that(properties.meta_property("text")(line_edit), equal_to("text"), "text")
+    assert_that(properties.meta_property("maxLength")(line_edit), equal_to(32767), "max length")
+
+
+def test_reads_property_changed_without_notification(qt):
+    line_edit, text = QLineEdit("old"), properties.meta_property("text")
+    assert_that(text(line_edit), equal_to("old"), "text before change")
+
+    line_edit.blockSignals(True)
+    line_edit.setText("new")
+    assert_that(text(line_edit), equal_to("new"), "text after change")
+
+
+def test_wakes_up_watchers_when_property_changes(qt):
+    gauge, watcher = Gauge(), ChangeWatcher(qt)
+    watcher.install()
+    properties.meta_property("level")(gauge)
+    gauge.level = 5
+
+    start_time = time.time()
+    watcher.wait_for_change(2000)
+    watcher.uninstall()
+    assert_that(time.time() - start_time, less_than(1), "time to notice change")
+
+
+def test_stops_watching_notify_signals_once_done_checking(qt):
+    gauge = Gauge()
+    prober = EventDrivenProber(fallback_delay_in_ms=10, timeout_in_ms=100)
+    prober.check(WidgetPropertyAssertionProbe(WidgetIdentity(gauge), properties.meta_property("level"), 0))
+
+    assert_that(gauge.receivers(gauge.levelChanged), equal_to(0), "connections left")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import pytest
+from PyQt5.QtWidgets import QDialog, QComboBox, QVBoxLayout, QWidget, QLabel
+from hamcrest import assert_that, contains_inanyorder, empty
+from pytest import raises
+
+from cute.selectors import compile_query
+from cute.widgets import all_selected
+from .conftest import found
+
+
+class ExportDialog(QDialog):
+    pass
+
+
+@pytest.fixture()
+def dialog(qt):
+    dialog = ExportDialog()
+    dialog.setObjectName("export")
+    QVBoxLayout(dialog)
+    return dialog
+
+
+def add(parent, widget, name=""):
+    widget.setObjectName(name)
+    parent.layout().addWidget(widget)
+    return widget
+
+
+def add_combo(parent, *items):
+    combo = add(parent, QComboBox())
+    combo.addItems(items)
+    return combo
+
+
+def test_selects_widgets_by_type_name_and_property(dialog):
+    csv = add_combo(dialog, "CSV")
+    add_combo(dialog, "XML")
+
+    assert_that(found(all_selected('QDialog#export QComboBox[currentText="CSV"]')), contains_inanyorder(csv),
+                "combos")
+    assert_that(found(all_selected('QDialog#import QComboBox')), empty(), "combos")
+
+
+def test_selects_widgets_of_custom_classes(dialog):
+    combo = add_combo(dialog, "CSV")
+
+    assert_that(found(all_selected("ExportDialog > QComboBox")), contains_inanyorder(combo), "combos")
+
+
+def test_distinguishes_children_from_descendants(dialog):
+    panel = add(dialog, QWidget(), "panel")
+    QVBoxLayout(panel)
+    nested = add(panel, QLabel(), "nested")
+    child = add(dialog, QLabel(), "child")
+
+    assert_that(found(all_selected("#export > QLabel")), contains_inanyorder(child), "child labels")
+    assert_that(found(all_selected("#export QLabel")), contains_inanyorder(child, nested), "labels")
+    assert_that(found(all_selected("#export > #panel > QLabel")), contains_inanyorder(nested), "nested labels")
+
+
+def test_selects_widgets_by_state(dialog):
+    enabled = add(dialog, QLabel(), "enabled")
+    add(dialog, QLabel(), "disabled").setEnabled(False)
+
+    assert_that(found(all_selected("QDialog QLabel:enabled")), contains_inanyorder(enabled), "labels")
+
+
+@pytest.mark.parametrize("query", ["", "QDialog >", "QLabel QLabel*", "QLabel:unknown", "QLabel[text="])
+def test_rejects_invalid_queries(query):
+    with raises(ValueError):
+        compile_query(query)